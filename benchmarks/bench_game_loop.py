@@ -0,0 +1,96 @@
+"""Load benchmark of the game loop with fake Buzz! dongles and no display.
+
+For each pack size a ``HeadlessGame`` plays rounds of a randomized buzz
+trace: several teams hammer the red button at once, the first one gets
+the answer marked wrong or right, and the host moves to the next song.
+Reports percentiles of the frame time (update + draw), the buzz-to-pause
+latency (report queued by the dongle until the song is paused) and the
+song-switch latency.
+
+Usage: uv run benchmarks/bench_game_loop.py [--sizes 10 1000 10000] [--rounds 200] [--dongles 2]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import pygame
+
+from headless import HeadlessGame, make_pack
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return "no samples"
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1000
+    return (
+        f"p50 {pick(0.50):7.3f} ms  p95 {pick(0.95):7.3f} ms  "
+        f"p99 {pick(0.99):7.3f} ms  max {values[-1] * 1000:7.3f} ms"
+    )
+
+
+def run(songs, rounds, dongles, rng):
+    categories = max(1, songs // 100)
+    with tempfile.TemporaryDirectory() as directory:
+        pack_dir = make_pack(Path(directory) / "pack", categories, songs // categories)
+        harness = HeadlessGame(pack_dir, dongles=dongles)
+        game = harness.game
+        controllers = game.buzz_controller.controller_count
+        buzz_latencies = []
+        switch_latencies = []
+        try:
+            game.start_game()
+            harness.step()
+            for _ in range(rounds):
+                harness.run_until(lambda: game.is_buzz_round_active)
+                teams = rng.sample(range(controllers), rng.randint(1, controllers))
+                pushed_at = time.perf_counter()
+                for team in teams:
+                    harness.press(team)
+                if harness.run_until(lambda: game.waiting_for_player is not None):
+                    buzz_latencies.append(time.perf_counter() - pushed_at)
+                for team in teams:
+                    harness.release(team)
+                harness.key(pygame.K_q if rng.random() < 0.5 else pygame.K_a)
+                harness.step()
+
+                start = time.perf_counter()
+                if game.current_song < len(game.song.category) - 1:
+                    game.next_song()
+                else:
+                    game.stop_buzz_round()
+                    game.select_song((game.current_category + 1) % len(game.pack), 0)
+                    game.play_current_song()
+                    game.start_buzz_round()
+                switch_latencies.append(time.perf_counter() - start)
+                for _ in range(5):
+                    harness.step()
+        finally:
+            harness.close()
+        print(f"pack of {songs} songs, {controllers} teams, {rounds} rounds")
+        print(f"  frame time   {percentiles(harness.frame_times)}")
+        print(f"  buzz->pause  {percentiles(buzz_latencies)}")
+        print(f"  song switch  {percentiles(switch_latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--dongles", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for songs in args.sizes:
+        run(songs, args.rounds, args.dongles, rng)
+
+
+if __name__ == "__main__":
+    main()
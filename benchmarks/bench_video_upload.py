@@ -0,0 +1,85 @@
+"""Microbenchmark of the per-frame video upload path.
+
+Compares the old ``update_video_frame`` path (cvtColor + resize + swapaxes +
+make_surface for every frame) with ``FrameUploader.upload``, the path
+``VideoPlayer`` uses (copy the decoder's BGR0 pixels into a persistent
+surface, then scale into a second persistent surface). Frames are
+synthetic ffpyplayer images, so no video file is needed.
+
+Usage: uv run benchmarks/bench_video_upload.py [--source 1280x720] [--screen 800x600]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import cv2
+import numpy as np
+import pygame
+from ffpyplayer.pic import Image
+
+from video import FRAME_FORMAT, FrameUploader
+
+
+def parse_size(value):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def old_path(frame_bgr, screen_size):
+    frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+    frame = cv2.resize(frame, screen_size)
+    return pygame.surfarray.make_surface(frame.swapaxes(0, 1))
+
+
+def measure(name, func, frame, frames, surface_bytes):
+    for _ in range(5):
+        func(frame)
+    tracemalloc.start()
+    start_traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    for _ in range(frames):
+        func(frame)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    traced = max(0, peak - start_traced)
+    print(
+        f"{name:>4}: {frames / elapsed:8.1f} frames/s, "
+        f"{traced:>10,} B traced peak/frame, "
+        f"{surface_bytes:>10,} B surface pixels/frame"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", type=parse_size, default=(1280, 720))
+    parser.add_argument("--screen", type=parse_size, default=(800, 600))
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    width, height = args.source
+    rng = np.random.default_rng(0)
+    frame_bgr = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    padding = np.zeros((height, width), np.uint8)
+    pixels = np.dstack([frame_bgr, padding] if FRAME_FORMAT == "bgr0" else [padding, frame_bgr[..., ::-1]])
+    image = Image(plane_buffers=[pixels.tobytes()], pix_fmt=FRAME_FORMAT, size=(width, height))
+
+    print(f"source {width}x{height} -> screen {args.screen[0]}x{args.screen[1]}")
+    # make_surface allocates a new 32-bit surface of screen size for every frame
+    measure("old", lambda f: old_path(f, args.screen), frame_bgr, args.frames,
+            args.screen[0] * args.screen[1] * 4)
+    measure("new", FrameUploader(args.screen).upload, image, args.frames, 0)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
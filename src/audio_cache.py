@@ -0,0 +1,152 @@
+import collections
+import io
+import os
+import threading
+
+
+class CachedAudioFile(io.RawIOBase):
+    """Read-only file whose first bytes are served from memory.
+
+    ``mixer.music`` streams from it like from a regular file: the preloaded
+    head covers the start of playback and anything past it is read from
+    disk on demand.
+    """
+
+    def __init__(self, path, head):
+        self.path = path
+        self.head = memoryview(head)
+        self.size = os.path.getsize(path)
+        self.position = 0
+        self._file = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.position < len(self.head):
+            chunk = self.head[self.position : self.position + len(buffer)]
+            buffer[: len(chunk)] = chunk
+            self.position += len(chunk)
+            return len(chunk)
+        if self._file is None:
+            # Kept open across reads for streaming; closed by close()
+            self._file = open(self.path, "rb")  # noqa: SIM115
+        self._file.seek(self.position)
+        count = self._file.readinto(buffer)
+        self.position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+
+class AudioPreloader:
+    """LRU cache of song files loaded in the background.
+
+    ``prefetch`` queues the songs that are likely to be played next; a
+    worker thread reads the first ``head_bytes`` of each into memory, so
+    ``open`` can hand ``mixer.music.load`` a file that starts from memory.
+    A miss never reads on the caller's thread: the file is streamed from
+    disk and the worker caches it for the next time. The cache never holds
+    more than ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=128 * 1024 * 1024, head_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.head_bytes = head_bytes
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = collections.OrderedDict()
+        self._pending = []
+        self._missed = set()
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="audio-preloader", daemon=True
+        )
+        self._thread.start()
+
+    def prefetch(self, paths):
+        """Replaces the queued preloads with ``paths`` (first one loads first).
+
+        Songs queued by a cache miss in ``open`` stay at the front.
+        """
+        with self._condition:
+            missed = [path for path in self._pending if path in self._missed]
+            self._pending = missed + [
+                path for path in map(str, paths) if path not in missed
+            ]
+            self._condition.notify()
+
+    def open(self, path):
+        """Returns a ``CachedAudioFile`` for ``path``, read from disk on a cache miss."""
+        path = str(path)
+        with self._condition:
+            head = self._cache.get(path)
+            if head is not None:
+                self._cache.move_to_end(path)
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._missed.add(path)
+                if path not in self._pending:
+                    self._pending.insert(0, path)
+                    self._condition.notify()
+        return CachedAudioFile(path, head if head is not None else b"")
+
+    def is_cached(self, path):
+        with self._condition:
+            return str(path) in self._cache
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                path = self._pending.pop(0)
+                self._missed.discard(path)
+                if path in self._cache:
+                    continue
+            try:
+                self._load(path)
+            except OSError as e:
+                print(f"Error: Could not preload {path}. Details: {e}")
+
+    def _load(self, path):
+        with open(path, "rb") as file:
+            head = file.read(self.head_bytes)
+        with self._condition:
+            if path not in self._cache:
+                self._cache[path] = head
+                self.cached_bytes += len(head)
+            self._cache.move_to_end(path)
+            while self.cached_bytes > self.max_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self.cached_bytes -= len(evicted)
+        return head
+
+    def close(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=1.0)
@@ -1,108 +1,436 @@
+import collections
 import sys
+import threading
 import time
 
-import hid  # type: ignore[import]
+# ``sequence`` numbers the reports in arrival order across all dongles, so
+# events sharing a sequence were reported together and cannot be ordered
+BuzzEvent = collections.namedtuple(
+    "BuzzEvent", ["controller", "button", "pressed", "timestamp", "sequence"],
+    defaults=(0,),
+)
+
+# Buttons in the order the device reports them: five bits per controller,
+# controller 0 in the lowest bits of report bytes 2..4. Each dongle drives
+# four controllers; dongle ``d`` owns controllers ``4 * d`` to ``4 * d + 3``
+# and bits ``20 * d`` upwards of a ``ButtonState``.
+BUTTONS = ("red", "yellow", "green", "orange", "blue")
+CONTROLLERS_PER_DEVICE = 4
+MAX_DEVICES = 4
+MAX_CONTROLLERS = CONTROLLERS_PER_DEVICE * MAX_DEVICES
+DEVICE_BITS = CONTROLLERS_PER_DEVICE * len(BUTTONS)
+BUTTON_MASKS = [
+    {button: 1 << (controller * 5 + i) for i, button in enumerate(BUTTONS)}
+    for controller in range(MAX_CONTROLLERS)
+]
+CONTROLLER_MASKS = [0x1F << (controller * 5) for controller in range(MAX_CONTROLLERS)]
+DEVICE_MASKS = [((1 << DEVICE_BITS) - 1) << (device * DEVICE_BITS) for device in range(MAX_DEVICES)]
+BIT_BUTTONS = [
+    (controller, button) for controller in range(MAX_CONTROLLERS) for button in BUTTONS
+]
+# Output report for each combination of the four LEDs of one dongle
+LIGHT_REPORTS = [
+    bytes([0x00, 0x00] + [0xFF if leds & (1 << i) else 0x00 for i in range(4)] + [0x00, 0x00])
+    for leds in range(16)
+]
+
+
+class ButtonState:
+    """Snapshot of every button as a single integer, one bit per button.
+
+    Bit ``controller * 5 + BUTTONS.index(button)`` is set while the button is
+    held, which is exactly the layout of the raw report.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def from_report(cls, data, device=0):
+        bits = data[2] | (data[3] << 8) | ((data[4] & 0x0F) << 16)
+        return cls(bits << (device * DEVICE_BITS))
+
+    def is_pressed(self, controller, button):
+        return (self.bits & BUTTON_MASKS[controller][button]) != 0
+
+    def controller_pressed(self, controller):
+        """Returns the first held button of ``controller`` (in ``BUTTONS`` order) or None."""
+        bits = (self.bits & CONTROLLER_MASKS[controller]) >> (controller * 5)
+        if bits:
+            return BUTTONS[(bits & -bits).bit_length() - 1]
+        return None
+
+    def pressed_since(self, previous):
+        """Returns the buttons that went down since ``previous``."""
+        return ButtonState(self.bits & ~previous.bits)
+
+    def released_since(self, previous):
+        """Returns the buttons that went up since ``previous``."""
+        return ButtonState(previous.bits & ~self.bits)
+
+    def __iter__(self):
+        """Yields ``(controller, button)`` for every held button, lowest bit first."""
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield BIT_BUTTONS[lowest.bit_length() - 1]
+            bits ^= lowest
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __eq__(self, other):
+        return isinstance(other, ButtonState) and self.bits == other.bits
+
+    def __repr__(self):
+        return f"ButtonState(0x{self.bits:05x})"
+
+    def as_dicts(self, controller_count=CONTROLLERS_PER_DEVICE):
+        """Returns the legacy ``[{"red": bool, ...}, ...]`` view."""
+        return [
+            {button: (self.bits & mask) != 0 for button, mask in masks.items()}
+            for masks in BUTTON_MASKS[:controller_count]
+        ]
+
+
+def controllers_mask(controllers):
+    """Returns the light mask with one bit set per controller index."""
+    mask = 0
+    for controller in controllers:
+        mask |= 1 << controller
+    return mask
+
+
+class LightAnimator:
+    """Plays LED patterns for a ``BuzzController`` on its own timer thread.
+
+    A pattern is a list of ``(mask, seconds)`` frames. Frame deadlines are
+    advanced from the previous deadline rather than from "now", so a late
+    wake-up shortens the next frame instead of drifting the whole pattern.
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._closed = False
+        self._frames = None
+        self._index = 0
+        self._loop = True
+        self._final_mask = 0
+        self._deadline = 0.0
+
+    def play(self, frames, loop=True, final_mask=0):
+        """Starts a pattern; the first frame is shown before returning.
+
+        Args:
+            frames (list): ``(mask, seconds)`` tuples
+            loop (bool): Repeat the pattern until another one is started
+            final_mask (int): Lights left on when a non-looping pattern ends
+        """
+        with self._condition:
+            self._frames = list(frames)
+            self._index = 0
+            self._loop = loop
+            self._final_mask = final_mask
+            self._deadline = time.perf_counter() + self._frames[0][1]
+            self.controller.light_set_mask(self._frames[0][0])
+            self._ensure_thread()
+            self._condition.notify()
+
+    def set(self, mask):
+        """Stops any pattern and holds ``mask`` steady."""
+        with self._condition:
+            self._frames = None
+            self.controller.light_set_mask(mask)
+            self._condition.notify()
+
+    def off(self):
+        self.set(0)
+
+    def blink(self, controllers, interval=0.5, steady=()):
+        """Blinks ``controllers`` while keeping ``steady`` controllers lit."""
+        on_mask = controllers_mask(controllers)
+        steady_mask = controllers_mask(steady)
+        self.play([(on_mask | steady_mask, interval), (steady_mask, interval)])
+
+    def chase(self, controllers, interval=0.15):
+        """Lights ``controllers`` one after another."""
+        self.play([(1 << controller, interval) for controller in controllers])
+
+    def flash(self, controllers, times=3, interval=0.1):
+        """Flashes ``controllers`` quickly, then leaves them lit (winner flash)."""
+        mask = controllers_mask(controllers)
+        self.play([(mask, interval), (0, interval)] * times, loop=False, final_mask=mask)
+
+    def stop(self):
+        """Stops the current pattern, leaving the lights as they are."""
+        with self._condition:
+            self._frames = None
+            self._condition.notify()
+
+    def wake(self):
+        """Makes the thread retry a held-back LED write after the rate limit."""
+        with self._condition:
+            if self._closed:
+                return
+            self._ensure_thread()
+            self._condition.notify()
+
+    def shutdown(self):
+        with self._condition:
+            self._frames = None
+            self._running = False
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="buzz-lights", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        with self._condition:
+            while self._running:
+                now = time.perf_counter()
+                if self._frames is not None and now >= self._deadline:
+                    self._advance(now)
+                self.controller.flush_lights()
+
+                timeout = None
+                if self._frames is not None:
+                    timeout = max(0.0, self._deadline - time.perf_counter())
+                if self.controller.lights_pending():
+                    timeout = self.controller.light_write_interval
+                self._condition.wait(timeout)
+
+    def _advance(self, now):
+        self._index += 1
+        if self._index >= len(self._frames):
+            if not self._loop:
+                self._frames = None
+                self.controller.light_set_mask(self._final_mask)
+                return
+            self._index = 0
+        mask, duration = self._frames[self._index]
+        self._deadline += duration
+        if self._deadline < now:
+            # Too far behind (e.g. the machine was suspended): resync to now
+            self._deadline = now + duration
+        self.controller.light_set_mask(mask)
 
 
 class BuzzController:
-    light_array = bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
+    """Every Buzz! dongle attached, exposed as one set of controllers.
+
+    Controllers are numbered across dongles in the order ``hid.enumerate``
+    reports them, so two dongles give controllers 0-7.
+    """
+
     light_blinking = False
-    buttonState = [
-        {"red": False, "blue": False, "orange": False, "green": False, "yellow": False},
-        {"red": False, "blue": False, "orange": False, "green": False, "yellow": False},
-        {"red": False, "blue": False, "orange": False, "green": False, "yellow": False},
-        {"red": False, "blue": False, "orange": False, "green": False, "yellow": False},
-    ]
     vid = 0x54C
     pid = 0x02
+    read_timeout_ms = 10
+    light_write_interval = 0.02
+    # Called from a reader thread after button presses were queued
+    on_press = None
 
-    def __init__(self):
+    def __init__(self, devices=None):
+        self.events = collections.deque()
+        self._reader_threads = []
+        self._reader_running = False
+        self._discard_before = 0.0
+        self.state = ButtonState()
+        self._state_lock = threading.Lock()
+        self.report_sequence = 0
+        self.light_mask = 0
+        self._light_lock = threading.Lock()
+        self._last_light_write = 0.0
+        self.lights = LightAnimator(self)
+        self._light_mask_before_blink = None
+        self._device_errors = (IOError, ValueError)
         try:
-            self.hid = hid.Device(self.vid, self.pid)
-            self.hid.nonblocking = 1
-            self.hid.write(self.light_array)
-        except (IOError, ValueError, hid.HIDException) as e:
+            if devices is None:
+                # Imported here so fake devices work without the native hidapi library
+                import hid  # type: ignore[import]
+
+                self._device_errors += (hid.HIDException,)
+                devices = self._open_devices(hid)
+            for device in devices:
+                device.nonblocking = 1
+                device.write(LIGHT_REPORTS[0])
+        except (ImportError, *self._device_errors) as e:
             print(
                 f"Error: Buzz Controller not detected. Please connect the controller before starting. Details: {e}"
             )
             sys.exit(1)
+        self.devices = devices
+        self.hid = devices[0]
+        self.controller_count = CONTROLLERS_PER_DEVICE * len(devices)
+        self._device_states = [ButtonState() for _ in devices]
+        self._written_light_reports = [LIGHT_REPORTS[0] for _ in devices]
 
-    def light_blink(self, controller):
-        blink_lights_off = bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
-        self.blink_lights_on = bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00])
-
-        for i in controller:
-            self.blink_lights_on = (
-                self.blink_lights_on[: i + 2]
-                + bytes([0xFF])
-                + self.blink_lights_on[i + 3 :]
+    def _open_devices(self, hid):
+        paths = [info["path"] for info in hid.enumerate(self.vid, self.pid)]
+        if len(paths) > MAX_DEVICES:
+            print(f"Warning: only the first {MAX_DEVICES} Buzz dongles will be used")
+            paths = paths[:MAX_DEVICES]
+        if not paths:
+            # Let hid raise the "not found" error for us
+            return [hid.Device(self.vid, self.pid)]
+        return [hid.Device(path=path) for path in paths]
+
+    def start_reader(self):
+        """Starts one background thread per dongle that drains it continuously.
+
+        Every report is stamped with ``time.perf_counter()`` on arrival and
+        each button change is appended to ``self.events`` as a ``BuzzEvent``.
+        While the readers run, ``get_button_status`` returns the state kept
+        by them instead of reading the devices itself.
+        """
+        if self._reader_threads:
+            return
+        self._reader_running = True
+        for index, device in enumerate(self.devices):
+            thread = threading.Thread(
+                target=self._read_loop,
+                args=(index, device),
+                name=f"buzz-reader-{index}",
+                daemon=True,
             )
+            self._reader_threads.append(thread)
+            thread.start()
 
-        if not self.light_blinking:
-            self.light_blinking = True
-            blink = True
-            while self.light_blinking:
-                if blink:
-                    self.hid.write(self.blink_lights_on)
-                else:
-                    self.hid.write(blink_lights_off)
-                blink = not blink
-                time.sleep(0.5)
+    def stop_reader(self):
+        self._reader_running = False
+        for thread in self._reader_threads:
+            thread.join(timeout=1.0)
+        self._reader_threads = []
 
-            self.hid.write(self.light_array)
+    def get_events(self):
+        """Returns (and removes) every queued ``BuzzEvent`` ordered by timestamp.
 
-    def clear_button_states(self):
+        Events stamped before the cutoff armed by ``discard_events_before``
+        are dropped.
+        """
+        events = []
         while True:
-            data = self.hid.read(5)
-            if not data:
+            try:
+                event = self.events.popleft()
+            except IndexError:
                 break
+            if event.timestamp >= self._discard_before:
+                events.append(event)
+        if len(self.devices) > 1:
+            # Readers of different dongles may append slightly out of order
+            events.sort(key=lambda event: event.timestamp)
+        return events
+
+    def discard_events_before(self, timestamp=None):
+        """Ignores every report that arrived before ``timestamp``.
+
+        Unlike ``clear_button_states`` this never touches the device, so it
+        is safe to call from the render loop.
+
+        Args:
+            timestamp (float): ``time.perf_counter()`` value, defaults to now
+        """
+        self._discard_before = time.perf_counter() if timestamp is None else timestamp
 
-        for controller in range(4):
-            for button in self.buttonState[controller]:
-                self.buttonState[controller][button] = False
+    def _read_loop(self, index, device):
+        while self._reader_running:
+            try:
+                data = device.read(5, self.read_timeout_ms)
+            except self._device_errors as e:
+                print(f"Error: Buzz Controller {index} read failed. Details: {e}")
+                break
+            if data:
+                self._process_report(data, time.perf_counter(), index)
+            if index == 0:
+                self.flush_lights()
+
+    def _process_report(self, data, timestamp, device=0):
+        current = ButtonState.from_report(data, device)
+        with self._state_lock:
+            self.report_sequence += 1
+            sequence = self.report_sequence
+            previous = self._device_states[device]
+            self._device_states[device] = current
+            self.state = ButtonState((self.state.bits & ~DEVICE_MASKS[device]) | current.bits)
+            pressed = current.pressed_since(previous)
+            for controller, button in pressed:
+                self.events.append(BuzzEvent(controller, button, True, timestamp, sequence))
+            for controller, button in current.released_since(previous):
+                self.events.append(BuzzEvent(controller, button, False, timestamp, sequence))
+        if pressed and self.on_press is not None:
+            self.on_press()
+
+    def light_blink(self, controller):
+        """Blinks the given controllers on the light animator thread.
+
+        Returns immediately; call ``light_blink_stop`` to restore the lights
+        that were on before blinking started.
+        """
+        if not self.light_blinking:
+            self.light_blinking = True
+            self._light_mask_before_blink = self.light_mask
+            self.lights.blink(controller, 0.5)
+
+    def clear_button_states(self):
+        if self._reader_threads:
+            self.events.clear()
+        else:
+            for device in self.devices:
+                while True:
+                    data = device.read(5)
+                    if not data:
+                        break
+
+        with self._state_lock:
+            self._device_states = [ButtonState() for _ in self.devices]
+            self.state = ButtonState()
+
+    @property
+    def buttonState(self):
+        return self.state.as_dicts(self.controller_count)
+
+    def get_state(self):
+        """Returns the current ``ButtonState``, reading one report per dongle if no reader runs."""
+        if not self._reader_threads:
+            for index, device in enumerate(self.devices):
+                data = device.read(5)
+                if data:
+                    current = ButtonState.from_report(data, index)
+                    with self._state_lock:
+                        self._device_states[index] = current
+                        self.state = ButtonState(
+                            (self.state.bits & ~DEVICE_MASKS[index]) | current.bits
+                        )
+        return self.state
 
     def get_button_status(self):
-        data = self.hid.read(5)
-        if data:
-            self.buttonState[0]["red"] = (data[2] & 0x01) != 0
-            self.buttonState[0]["yellow"] = (data[2] & 0x02) != 0
-            self.buttonState[0]["green"] = (data[2] & 0x04) != 0
-            self.buttonState[0]["orange"] = (data[2] & 0x08) != 0
-            self.buttonState[0]["blue"] = (data[2] & 0x10) != 0
-
-            self.buttonState[1]["red"] = (data[2] & 0x20) != 0
-            self.buttonState[1]["yellow"] = (data[2] & 0x40) != 0
-            self.buttonState[1]["green"] = (data[2] & 0x80) != 0
-            self.buttonState[1]["orange"] = (data[3] & 0x01) != 0
-            self.buttonState[1]["blue"] = (data[3] & 0x02) != 0
-
-            self.buttonState[2]["red"] = (data[3] & 0x04) != 0
-            self.buttonState[2]["yellow"] = (data[3] & 0x08) != 0
-            self.buttonState[2]["green"] = (data[3] & 0x10) != 0
-            self.buttonState[2]["orange"] = (data[3] & 0x20) != 0
-            self.buttonState[2]["blue"] = (data[3] & 0x40) != 0
-
-            self.buttonState[3]["red"] = (data[3] & 0x80) != 0
-            self.buttonState[3]["yellow"] = (data[4] & 0x01) != 0
-            self.buttonState[3]["green"] = (data[4] & 0x02) != 0
-            self.buttonState[3]["orange"] = (data[4] & 0x04) != 0
-            self.buttonState[3]["blue"] = (data[4] & 0x08) != 0
-        return self.buttonState
+        return self.get_state().as_dicts(self.controller_count)
 
     def get_button_pressed(self, controller):
-        buttons = self.get_button_status()
-        for key, value in buttons[controller].items():
-            if value:
-                return key
+        return self.get_state().controller_pressed(controller)
 
     def controller_get_first_pressed(
         self, buzzButton, controllers=[0, 1, 2, 3], timeout=1.0
     ):
         start_time = time.time()
         while True:
-            buttons = self.get_button_status()
+            state = self.get_state()
             for i in controllers:
-                if buttons[i][buzzButton]:
+                if state.is_pressed(i, buzzButton):
                     return i
 
             if time.time() - start_time > timeout:
@@ -111,15 +439,87 @@ class BuzzController:
             time.sleep(0.01)
 
     def light_blink_stop(self):
+        self.lights.stop()
+        if self._light_mask_before_blink is not None:
+            self.light_mask = self._light_mask_before_blink
+            self._light_mask_before_blink = None
+            self.flush_lights()
         self.light_blinking = False
 
+    @property
+    def light_array(self):
+        """Output report of the first dongle (legacy single-dongle view)."""
+        return LIGHT_REPORTS[self.light_mask & 0xF]
+
+    @light_array.setter
+    def light_array(self, report):
+        leds = 0
+        for i in range(CONTROLLERS_PER_DEVICE):
+            if report[i + 2]:
+                leds |= 1 << i
+        self.light_mask = (self.light_mask & ~0xF) | leds
+
     def light_set(self, controller, status):
-        temp_array = bytearray(self.light_array)
-        temp_array[controller + 2] = 0xFF if status else 0x00
-        self.light_array = bytes(temp_array)
-        self.hid.write(self.light_array)
+        if status:
+            self.light_mask |= 1 << controller
+        else:
+            self.light_mask &= ~(1 << controller)
+        self.flush_lights()
+
+    def light_set_mask(self, mask):
+        """Sets every LED at once; bit ``i`` of ``mask`` lights controller ``i``.
+
+        Args:
+            mask (int): Light mask, see ``controllers_mask``
+        """
+        self.light_mask = mask
+        self.flush_lights()
+
+    def _light_reports(self):
+        mask = self.light_mask
+        return [
+            LIGHT_REPORTS[(mask >> (index * CONTROLLERS_PER_DEVICE)) & 0xF]
+            for index in range(len(self.devices))
+        ]
+
+    def lights_pending(self):
+        """Returns True if ``light_mask`` has not been written to the devices yet."""
+        return self._light_reports() != self._written_light_reports
+
+    def flush_lights(self, force=False):
+        """Sends the LED state to every dongle whose report changed since the last write.
+
+        Writes closer together than ``light_write_interval`` are held back
+        and the light thread is woken to retry them (the readers retry too),
+        so only the latest state is sent.
+
+        Args:
+            force (bool): Ignore the rate limit (used on shutdown)
+        """
+        with self._light_lock:
+            reports = self._light_reports()
+            if reports == self._written_light_reports:
+                return
+            now = time.perf_counter()
+            held_back = not force and now - self._last_light_write < self.light_write_interval
+            if not held_back:
+                for index, (device, report, written) in enumerate(
+                    zip(self.devices, reports, self._written_light_reports)
+                ):
+                    if report != written:
+                        try:
+                            device.write(report)
+                        except self._device_errors as e:
+                            # Losing the lights must not stop the reader or light thread
+                            print(f"Error: Buzz Controller {index} light write failed. Details: {e}")
+                self._written_light_reports = reports
+                self._last_light_write = now
+        if held_back:
+            # Outside the light lock: the light thread takes its lock first
+            self.lights.wake()
 
     def get_info(self):
-        with self.hid as h:
-            print(f"Device manufacturer: {h.manufacturer}")
-            print(f"Product: {h.product}")
+        for device in self.devices:
+            with device as h:
+                print(f"Device manufacturer: {h.manufacturer}")
+                print(f"Product: {h.product}")
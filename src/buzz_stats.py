@@ -0,0 +1,115 @@
+import json
+import random
+
+TIE_BREAKS = ("random", "earliest", "rotating")
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+HISTOGRAM_BOUNDS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class BuzzArbiter:
+    """Decides which team buzzed first.
+
+    Presses are ordered by arrival. Presses that arrived in the same HID
+    report are a tie, since the dongle does not say which came first, and
+    the tie is broken by ``policy``:
+
+    - ``random``: any of the tied teams, with equal chance
+    - ``earliest``: the team whose previous report (e.g. releasing the
+      button after the last round) arrived first
+    - ``rotating``: the first tied team after the previous tie winner,
+      in controller order
+    """
+
+    def __init__(self, policy="random", rng=None):
+        if policy not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie-break policy {policy!r}")
+        self.policy = policy
+        self.rng = rng or random.Random()
+        self.last_report = {}
+        self.last_tie_winner = -1
+
+    def observe(self, events):
+        """Remembers when each controller last reported a change."""
+        for event in events:
+            self.last_report[event.controller] = event.timestamp
+
+    def decide(self, presses):
+        """Returns the winning press and the controllers it was tied with.
+
+        Args:
+            presses (list): ``BuzzEvent`` presses of the eligible teams
+
+        Returns:
+            tuple: The winning ``BuzzEvent`` and the sorted controllers of
+            every press in its report (empty when there was no tie)
+        """
+        first = min(presses, key=lambda event: (event.timestamp, event.sequence))
+        tied = sorted(
+            {event.controller: event for event in presses if event.sequence == first.sequence}.values(),
+            key=lambda event: event.controller,
+        )
+        if len(tied) == 1:
+            return first, []
+        if self.policy == "random":
+            winner = self.rng.choice(tied)
+        elif self.policy == "earliest":
+            winner = min(
+                tied,
+                key=lambda event: self.last_report.get(event.controller, float("inf")),
+            )
+        else:
+            later = [event for event in tied if event.controller > self.last_tie_winner]
+            winner = (later or tied)[0]
+            self.last_tie_winner = winner.controller
+        return winner, [event.controller for event in tied]
+
+
+class BuzzStats:
+    """Per-show record of every decided buzz and its latencies.
+
+    For each buzz it keeps the HID arrival time and report sequence, the
+    time from arrival to the decision and to the song being paused, and
+    the teams it was tied with. ``export`` writes them with latency
+    histograms as JSON.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.buzzes = []
+
+    def record(self, event, tied, decided_at, paused_at):
+        self.buzzes.append(
+            {
+                "controller": event.controller,
+                "arrival": event.timestamp,
+                "sequence": event.sequence,
+                "decision_ms": (decided_at - event.timestamp) * 1000,
+                "pause_ms": (paused_at - event.timestamp) * 1000,
+                "tied": tied,
+            }
+        )
+
+    def histogram(self, key):
+        """Returns ``[(upper bound in ms or None, count), ...]`` for ``key``."""
+        counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for buzz in self.buzzes:
+            index = 0
+            while index < len(HISTOGRAM_BOUNDS) and buzz[key] > HISTOGRAM_BOUNDS[index]:
+                index += 1
+            counts[index] += 1
+        return list(zip(HISTOGRAM_BOUNDS + (None,), counts))
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "tie_break": self.policy,
+                    "ties": sum(1 for buzz in self.buzzes if buzz["tied"]),
+                    "buzzes": self.buzzes,
+                    "histograms": {
+                        key: self.histogram(key) for key in ("decision_ms", "pause_ms")
+                    },
+                },
+                file,
+                indent=4,
+            )
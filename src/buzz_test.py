@@ -1,4 +1,3 @@
-import _thread
 import sys
 import time
 
@@ -40,10 +39,10 @@ def handle_player_turn(controller):
 def cleanup():
     global buzz, running
     running = False
-    buzz.light_blinking = False
-    time.sleep(0.1)
-    for controller in range(4):
-        buzz.light_set(controller, False)
+    buzz.light_blink_stop()
+    buzz.lights.shutdown()
+    buzz.light_set_mask(0)
+    buzz.flush_lights(force=True)
 
 
 def on_press(key):
@@ -61,12 +60,10 @@ def main():
 
     try:
         while running:
-            blink_thread = _thread.start_new_thread(
-                buzz.light_blink, (available_controllers,)
-            )
+            buzz.light_blink(available_controllers)
 
             controller = buzz.controller_get_first_pressed("red", available_controllers)
-            buzz.light_blinking = False
+            buzz.light_blink_stop()
 
             if controller is None:
                 if not running:
@@ -1,105 +1,151 @@
-import json
 import time
 from pathlib import Path
 
-import cv2
 import i18n
 import pygame
 import pygame_menu
-from ffpyplayer.player import MediaPlayer
 from pygame import mixer
 
+from audio_cache import AudioPreloader
 from buzz_controller import BuzzController
+from buzz_stats import BuzzArbiter, BuzzStats
+from journal import JOURNAL_NAME, Journal
+from loudness import gain_to_volume, load_gains
+from pack_validator import print_report, validate_pack
+from profiler import Profiler
+from song_pack import SongPack
+from text_cache import TextCache
+from video import VideoPlayer
+
+# Posted by the Buzz! reader threads so an idle main loop wakes up on a press
+BUZZ_EVENT = pygame.USEREVENT
+# Posted by the remote control server when a command was queued
+REMOTE_EVENT = pygame.USEREVENT + 1
 
 
 class Game:
-    def __init__(self, screen_width, screen_height, song_pack="pack_01"):
+    def __init__(
+        self,
+        screen_width,
+        screen_height,
+        song_pack="pack_01",
+        video_scaling="fit",
+        preflight=False,
+        resume=False,
+        buzz_controller=None,
+        tie_break="random",
+        profiler=None,
+    ):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.MESSAGE_SHOW_TIMEOUT = 7000
+        self.buzz_controller = buzz_controller or BuzzController()
+        self.buzz_controller.on_press = self.post_buzz_event
+        self.buzz_controller.start_reader()
         self.players = [
-            {"name": "", "score": 0},
-            {"name": "", "score": 0},
-            {"name": "", "score": 0},
-            {"name": "", "score": 0},
+            {"name": "", "score": 0}
+            for _ in range(self.buzz_controller.controller_count)
         ]
         self.version = "1.1.0"
         self.song_pack = song_pack
         self.current_category = 0
         self.current_song = 0
-        self.songs_data = self.load_songs()
+        self.pack = SongPack.load(Path("data") / self.song_pack)
+        self.song = self.pack.song(0, 0)
+        self.journal = Journal.start(
+            self.pack.directory / JOURNAL_NAME, len(self.players), resume=resume
+        )
+        self.sync_players()
+        if resume and self.pack.song(self.journal.state.category, self.journal.state.song):
+            self.current_category = self.journal.state.category
+            self.current_song = self.journal.state.song
+            self.song = self.pack.song(self.current_category, self.current_song)
+        self.audio_cache = AudioPreloader()
+        self.track_gains = load_gains(self.pack.directory)
+        # Probe info by asset path, only filled by the pre-flight check
+        self.asset_info = {}
+        if preflight:
+            report = validate_pack(self.pack.directory)
+            print_report(report)
+            self.asset_info = report["assets"]
         self.is_playing = False
-        self.last_action = None
         self.current_song_playing = None
+        self.clip_end_ms = None
+        self.clip_fade_ms = 0
         self.is_paused = False
         self.debug_message = ""
         self.debug_message_time = 0
         self.waiting_for_player = None
         self.show_controls = False
+        self.profiler = profiler or Profiler()
+        self.show_profile = False
+        self.profile_lines = []
+        self.profile_lines_time = 0
         self.is_video_playing = False
-        self.video_start_time = 0
-        self.buzz_controller = BuzzController()
-        self.available_controllers = [0, 1, 2, 3]
+        self.available_controllers = list(range(len(self.players)))
         self.is_buzz_round_active = False
+        self.is_buzz_round_pending = False
         self.buzz_start_time = 0
-        self.last_buzz_check = 0
-        self.buzz_check_interval = 0.1
-        self.blink_state = False
-        self.last_blink_time = 0
         self.blink_interval = 0.5
+        self.buzz_arbiter = BuzzArbiter(tie_break)
+        self.buzz_stats = BuzzStats(tie_break)
         self.show_scores = False
 
         self.font = pygame.font.Font(None, 36)
         self.title_font = pygame.font.Font(None, 72)
+        self.text_cache = TextCache()
+        self.help_overlay = None
+        self.drawn_layers = None
 
-        self.media_player = None
-        self.video_cap = None
+        self.video_player = None
         self.video_surface = None
-        self.video_fps = 25
-        self.last_video_frame_time = 0
+        self.VIDEO_QUEUE_SIZE = 8
+        self.video_scaling = video_scaling
 
         self.CORRECT_ANSWER_POINTS = 5
         self.WRONG_ANSWER_POINTS = 3
+        self.PLAYERS_PER_COLUMN = 8
+        self.IDLE_WAKEUP_MS = 1000
+        self.PROFILE_REFRESH_MS = 500
 
     def update_translations(self):
-        pass
-
-    def load_songs(self):
-        try:
-            songs_file = Path(f"data/{self.song_pack}/songs.json")
-            with open(songs_file, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                return data
-        except FileNotFoundError:
-            print(f"Error: File not found data/{self.song_pack}/songs.json")
-            return {"categories": []}
-        except json.JSONDecodeError:
-            print(
-                f"Error: The file data/{self.song_pack}/songs.json has an invalid JSON format"
-            )
-            return {"categories": []}
+        self.text_cache.clear()
+        self.help_overlay = None
+        self.invalidate()
+
+    def sync_players(self):
+        """Copies the names and scores folded from the journal into ``self.players``."""
+        state = self.journal.state
+        for player, name, score in zip(self.players, state.names, state.scores):
+            player["name"] = name
+            player["score"] = score
+
+    def select_song(self, category_index, song_index):
+        self.current_category = category_index
+        self.current_song = song_index
+        self.song = self.pack.song(category_index, song_index)
+        self.journal.append("navigate", category=category_index, song=song_index)
 
     def start_game(self):
         self.is_playing = True
-        self.current_category = 0
-        self.current_song = 0
+        self.journal.append("names", names=[player["name"] for player in self.players])
+        # A resumed show carries on from the song it was at
+        self.select_song(self.current_category, self.current_song)
+        self.invalidate()
         self.play_current_song()
         self.start_buzz_round()
         return True
 
     def next_category(self):
-        if self.current_category < len(self.songs_data["categories"]) - 1:
+        if self.current_category < len(self.pack) - 1:
             mixer.music.stop()
             if self.is_video_playing:
                 self.stop_video()
-            self.is_buzz_round_active = False
-            for controller in self.available_controllers:
-                self.buzz_controller.light_set(controller, False)
-            self.current_category += 1
-            self.current_song = 0
+            self.stop_buzz_round()
+            self.select_song(self.current_category + 1, 0)
             self.play_current_song()
             self.set_debug_message(
-                f"{i18n.t('next_category')} {self.songs_data['categories'][self.current_category]['name']}"
+                f"{i18n.t('next_category')} {self.song.category.name}"
             )
             self.start_buzz_round()
 
@@ -108,76 +154,115 @@ class Game:
             mixer.music.stop()
             if self.is_video_playing:
                 self.stop_video()
-            self.is_buzz_round_active = False
-            for controller in self.available_controllers:
-                self.buzz_controller.light_set(controller, False)
-            self.current_category -= 1
-            self.current_song = 0
+            self.stop_buzz_round()
+            self.select_song(self.current_category - 1, 0)
             self.play_current_song()
             self.set_debug_message(
-                f"{i18n.t('prev_category')} {self.songs_data['categories'][self.current_category]['name']}"
+                f"{i18n.t('prev_category')} {self.song.category.name}"
             )
             self.start_buzz_round()
 
     def next_song(self):
         if self.is_video_playing:
             self.stop_video()
-        current_category = self.songs_data["categories"][self.current_category]
-        if self.current_song < len(current_category["songs"]) - 1:
-            self.current_song += 1
+        if self.current_song < len(self.song.category) - 1:
+            self.select_song(self.current_category, self.current_song + 1)
             self.play_current_song()
             self.set_debug_message(i18n.t("next_song"))
             self.start_buzz_round()
 
     def previous_song(self):
         if self.current_song > 0:
-            self.current_song -= 1
+            self.select_song(self.current_category, self.current_song - 1)
             self.play_current_song()
             self.set_debug_message(i18n.t("prev_song"))
 
     def play_current_song(self):
         if self.current_song_playing:
             mixer.music.stop()
-        current_song = self.songs_data["categories"][self.current_category]["songs"][
-            self.current_song
-        ]
+        current_song = self.song
+        if current_song is None:
+            return
         try:
-            file_path = Path(f"data/{self.song_pack}") / current_song["file"]
+            file_path = self.pack.path(current_song.file)
             if not file_path.exists():
                 self.set_debug_message(f"Error: File not found {file_path}")
                 return
 
-            if file_path.suffix.lower() == ".m4a":
-                try:
-                    mixer.music.load(str(file_path))
-                    mixer.music.play()
-                    self.current_song_playing = current_song
-                    self.is_paused = False
-                    self.set_debug_message(
-                        f"{i18n.t('playing')} {current_song['title']}"
-                    )
-                except Exception as e:
-                    self.set_debug_message(f"Error playing M4A: {str(e)}")
-                    print(f"Detailed error playing M4A: {str(e)}")
-            else:
-                mixer.music.load(str(file_path))
-                mixer.music.play()
-                self.current_song_playing = current_song
-                self.is_paused = False
-                self.set_debug_message(f"{i18n.t('playing')} {current_song['title']}")
+            with self.profiler.section("audio_load"):
+                mixer.music.load(self.audio_cache.open(file_path), file_path.suffix[1:])
+            self.play_clip(current_song)
+            # Loading new music resets the volume, so the gain is applied afterwards
+            mixer.music.set_volume(
+                gain_to_volume(self.track_gains.get(current_song.file, 0.0))
+            )
+            self.current_song_playing = current_song
+            self.is_paused = False
+            self.set_debug_message(f"{i18n.t('playing')} {current_song.title}")
         except Exception as e:
             self.set_debug_message(f"Error loading song: {str(e)}")
             print(f"Error loading song: {file_path}")
             print(f"Detailed error: {str(e)}")
+        self.prefetch_songs()
+
+    def play_clip(self, song):
+        """Plays the loaded music from the song's optional clip segment.
+
+        Songs may define ``start`` and ``duration`` (seconds) to play an
+        excerpt, and ``fade`` (seconds) to fade it in and out. SDL_mixer
+        seeks to ``start`` directly, nothing before it is decoded.
+        """
+        fade_ms = int(song.fade * 1000)
+        mixer.music.play(start=song.start, fade_ms=fade_ms)
+        self.clip_fade_ms = fade_ms
+        self.clip_end_ms = (
+            max(0, int(song.duration * 1000) - fade_ms) if song.duration else None
+        )
+
+    def update_clip(self):
+        # get_pos() counts milliseconds played since play(), pauses excluded
+        if self.clip_end_ms is None or self.is_paused:
+            return
+        if mixer.music.get_pos() >= self.clip_end_ms:
+            self.clip_end_ms = None
+            if self.clip_fade_ms:
+                mixer.music.fadeout(self.clip_fade_ms)
+            else:
+                mixer.music.stop()
+
+    def prefetch_songs(self):
+        """Preloads the songs reachable with one key press from the current one."""
+        candidates = [
+            self.pack.song(self.current_category, self.current_song + 1),
+            self.pack.song(self.current_category, self.current_song - 1),
+            self.pack.song(self.current_category + 1, 0),
+            self.pack.song(self.current_category - 1, 0),
+        ]
+        paths = [self.pack.path(song.file) for song in candidates if song is not None]
+        self.audio_cache.prefetch(path for path in paths if path.exists())
+
+    def warm_up(self):
+        """Preloads the first songs of the first category while the menu is shown.
+
+        Only as many songs as fit in the cache are queued, so the first
+        one is never evicted by the others before "Play" is pressed.
+        """
+        if not self.pack.categories:
+            return
+        count = max(1, self.audio_cache.max_bytes // self.audio_cache.head_bytes)
+        paths = [self.pack.path(song.file) for song in self.pack.categories[0].songs[:count]]
+        self.audio_cache.prefetch(path for path in paths if path.exists())
+
+    def show_idle_lights(self):
+        """Chases the controller lights while the players type their names."""
+        self.buzz_controller.lights.chase(self.available_controllers)
 
     def toggle_pause(self):
         if self.current_song_playing:
             if not self.is_paused:
                 mixer.music.pause()
                 self.is_paused = True
-                for controller in self.available_controllers:
-                    self.buzz_controller.light_set(controller, False)
-                self.is_buzz_round_active = False
+                self.stop_buzz_round()
                 self.set_debug_message(i18n.t("song_paused"))
             else:
                 mixer.music.unpause()
@@ -210,7 +295,7 @@ class Game:
                 points = -self.players[player_index]["score"]
                 new_score = 0
 
-            self.last_action = {"player": player_index, "points": points}
+            self.journal.append("score", player=player_index, points=points)
             self.players[player_index]["score"] = new_score
             player_name = (
                 self.players[player_index]["name"]
@@ -220,8 +305,7 @@ class Game:
                 i18n.t("correct_answer") if points > 0 else i18n.t("wrong_answer")
             )
             if points > 0:
-                current_song = self.songs_data["categories"][self.current_category]["songs"][self.current_song]
-                song_title = current_song.get("title", "")
+                song_title = self.song.title
                 self.set_debug_message(
                     f"{player_name} {points_text} {abs(points)} {i18n.t('points')} - {song_title}"
                 )
@@ -232,16 +316,24 @@ class Game:
             self.waiting_for_player = None
 
     def undo_last_action(self):
-        if self.last_action:
-            self.players[self.last_action["player"]]["score"] -= self.last_action[
-                "points"
-            ]
+        if self.journal.state.undo_stack:
+            score = self.journal.append("undo")
+            self.sync_players()
             player_name = (
-                self.players[self.last_action["player"]]["name"]
-                or f"{i18n.t('player')} {self.last_action['player'] + 1}"
+                self.players[score["player"]]["name"]
+                or f"{i18n.t('player')} {score['player'] + 1}"
             )
             self.set_debug_message(f"{i18n.t('undo_action')} {player_name}")
-            self.last_action = None
+
+    def redo_last_action(self):
+        if self.journal.state.redo_stack:
+            score = self.journal.append("redo")
+            self.sync_players()
+            player_name = (
+                self.players[score["player"]]["name"]
+                or f"{i18n.t('player')} {score['player'] + 1}"
+            )
+            self.set_debug_message(f"{i18n.t('redo_action')} {player_name}")
 
     def toggle_video(self):
         if self.is_video_playing:
@@ -250,63 +342,52 @@ class Game:
             self.play_video()
 
     def play_video(self):
-        import cv2
-        current_song = self.songs_data["categories"][self.current_category]["songs"][
-            self.current_song
-        ]
-        video_path = current_song.get("video", False)
-
-        if not video_path or video_path == "false":
+        if self.song is None or not self.song.video:
             self.set_debug_message(i18n.t("no_video"))
             return
 
-        video_path = Path(f"data/{self.song_pack}") / video_path
+        video_path = self.pack.path(self.song.video)
         if not video_path.exists():
             self.set_debug_message(i18n.t("video_not_found"))
             return
 
         try:
             self.stop_video()
-            self.media_player = MediaPlayer(str(video_path))
-            self.video_cap = cv2.VideoCapture(str(video_path))
-            self.video_fps = self.video_cap.get(cv2.CAP_PROP_FPS) or 25
-            self.last_video_frame_time = pygame.time.get_ticks()
+            self.video_player = VideoPlayer(
+                video_path,
+                (self.screen_width, self.screen_height),
+                queue_size=self.VIDEO_QUEUE_SIZE,
+                scaling=self.video_scaling,
+                source_size=self.asset_info.get(self.song.video, {}).get("size"),
+            )
             self.is_video_playing = True
-            self.video_start_time = pygame.time.get_ticks() / 1000.0
             self.set_debug_message(i18n.t("playing_video"))
         except Exception as e:
             self.set_debug_message(f"Error loading video: {str(e)}")
 
     def stop_video(self):
-        if self.media_player is not None:
-            self.media_player.close_player()
-            self.media_player = None
-        if self.video_cap is not None:
-            self.video_cap.release()
-            self.video_cap = None
+        if self.video_player is not None:
+            self.video_player.close()
+            stats = self.video_player.stats()
+            print(
+                f"Video stats: {stats['decoded']} decoded, {stats['shown']} shown, "
+                f"{stats['dropped']} dropped, queue {stats['queued']}/{stats['queue_size']}, "
+                f"decode {stats['decode_ms_avg']:.1f} ms avg / {stats['decode_ms_max']:.1f} ms max, "
+                f"upload {stats['upload_ms_avg']:.1f} ms avg / {stats['upload_ms_max']:.1f} ms max"
+            )
+            self.video_player = None
         self.is_video_playing = False
         self.video_surface = None
         self.set_debug_message(i18n.t("video_stopped"))
 
     def update_video_frame(self):
-        if not self.is_video_playing or self.video_cap is None:
+        if not self.is_video_playing or self.video_player is None:
             return
-        now = pygame.time.get_ticks()
-        frame_interval = 1000 / self.video_fps
-        if now - self.last_video_frame_time >= frame_interval:
-            ret, frame = self.video_cap.read()
-            if not ret:
-                self.stop_video()
-                return
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame = cv2.resize(frame, (self.screen_width, self.screen_height))
-            frame = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
+        frame = self.video_player.get_frame()
+        if frame is not None:
             self.video_surface = frame
-            self.last_video_frame_time = now
-        if self.media_player is not None:
-            audio_frame, val = self.media_player.get_frame()
-            if val == 'eof':
-                self.stop_video()
+        elif self.video_player.is_finished():
+            self.stop_video()
 
     def set_debug_message(self, message):
         self.debug_message = message
@@ -317,90 +398,232 @@ class Game:
         if current_time - self.debug_message_time > self.MESSAGE_SHOW_TIMEOUT:
             self.debug_message = ""
 
-    def draw(self, screen):
-        screen.fill((0, 0, 0))
-
-        player_y = 50
+    def hud_layers(self):
+        """Returns the text of each HUD layer as lists of (text, position)."""
+        players = []
+        column_width = self.screen_width // 2
         for i, player in enumerate(self.players, 1):
             if self.show_scores:
                 player_text = f"{i18n.t('player')} {i}: {player['name']} - {player['score']} {i18n.t('points')}"
             else:
                 player_text = f"{i18n.t('player')} {i}: {player['name']}"
-            text_surface = self.font.render(player_text, True, (255, 255, 255))
-            screen.blit(text_surface, (20, player_y))
-            player_y += 40
-
-        if self.songs_data["categories"]:
-            current_category = self.songs_data["categories"][self.current_category]
-
-            category_text = f"{i18n.t('category')}: {current_category['name']}"
-            song_text = f"{i18n.t('track')}: {self.current_song + 1}/{len(current_category['songs'])}"
-
-            category_surface = self.font.render(category_text, True, (255, 255, 255))
-            song_surface = self.font.render(song_text, True, (255, 255, 255))
-
-            screen.blit(category_surface, (20, player_y + 20))
-            screen.blit(song_surface, (20, player_y + 60))
-
-        if (
+            column, row = divmod(i - 1, self.PLAYERS_PER_COLUMN)
+            players.append((player_text, (20 + column * column_width, 50 + row * 40)))
+        player_y = 50 + min(len(self.players), self.PLAYERS_PER_COLUMN) * 40
+
+        track = []
+        if self.song is not None:
+            current_category = self.song.category
+
+            category_text = f"{i18n.t('category')}: {current_category.name}"
+            song_text = f"{i18n.t('track')}: {self.current_song + 1}/{len(current_category)}"
+            track = [(category_text, (20, player_y + 20)), (song_text, (20, player_y + 60))]
+
+        debug = []
+        if self.show_profile:
+            # Refreshed twice a second so the numbers are readable
+            now = pygame.time.get_ticks()
+            if now - self.profile_lines_time >= self.PROFILE_REFRESH_MS:
+                self.profile_lines = self.profiler.lines()
+                self.profile_lines_time = now
+            bottom = self.screen_height - 40 - 30 * (len(self.profile_lines) - 1)
+            debug = [
+                (line, (20, bottom + 30 * index))
+                for index, line in enumerate(self.profile_lines)
+            ]
+        elif (
             self.debug_message
             and pygame.time.get_ticks() - self.debug_message_time < self.MESSAGE_SHOW_TIMEOUT
         ):
-            debug_surface = self.font.render(self.debug_message, True, (255, 255, 255))
-            screen.blit(debug_surface, (20, self.screen_height - 40))
+            debug = [(self.debug_message, (20, self.screen_height - 40))]
 
-        if self.show_controls:
-            help_surface = pygame.Surface((self.screen_width // 2, self.screen_height))
-            help_surface.set_alpha(128)
-            help_surface.fill((0, 0, 0))
-            screen.blit(help_surface, (self.screen_width // 2, 0))
-
-            controls = [
-                i18n.t("controls.title"),
-                i18n.t("controls.pause"),
-                i18n.t("controls.navigate"),
-                i18n.t("controls.correct"),
-                i18n.t("controls.wrong"),
-                i18n.t("controls.video"),
-                i18n.t("controls.buzz"),
-                i18n.t("controls.help"),
-                i18n.t("controls.scores"),
-            ]
+        return {"players": players, "track": track, "debug": debug}
+
+    def invalidate(self):
+        """Makes the next draw repaint the whole screen."""
+        self.drawn_layers = None
 
-            help_y = 50
-            for control in controls:
-                control_surface = self.font.render(control, True, (255, 255, 255))
-                screen.blit(control_surface, (self.screen_width // 2 + 20, help_y))
-                help_y += 40
+    def draw(self, screen):
+        """Draws the game and returns the screen areas that changed.
 
+        Each HUD layer (scores, category/track, debug message and controls
+        panel) is compared with what was drawn last frame, and only the
+        areas of the layers that changed are repainted.
+
+        Returns:
+            list: Rects to pass to ``pygame.display.update``, or None when
+            the whole screen was redrawn and must be flipped
+        """
+        with self.profiler.section("draw"):
+            return self._draw(screen)
+
+    def _draw(self, screen):
+        layers = self.hud_layers()
         if self.is_video_playing and self.video_surface is not None:
+            self._paint(screen, layers)
             video_rect = self.video_surface.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
             screen.blit(self.video_surface, video_rect)
+            self.invalidate()
+            return None
+
+        rects = {
+            name: [
+                self.text_cache.render(self.font, text).get_rect(topleft=position)
+                for text, position in entries
+            ]
+            for name, entries in layers.items()
+        }
+        rects["help"] = (
+            [pygame.Rect(self.screen_width // 2, 0, self.screen_width // 2, self.screen_height)]
+            if self.show_controls
+            else []
+        )
+        drawn = {name: (layers.get(name), rects[name]) for name in rects}
+        if self.drawn_layers is None:
+            self._paint(screen, layers)
+            self.drawn_layers = drawn
+            return None
+
+        dirty = []
+        for name, (entries, layer_rects) in drawn.items():
+            previous_entries, previous_rects = self.drawn_layers[name]
+            if entries != previous_entries or layer_rects != previous_rects:
+                dirty.extend(previous_rects)
+                dirty.extend(layer_rects)
+        self.drawn_layers = drawn
+        for rect in dirty:
+            screen.set_clip(rect)
+            self._paint(screen, layers)
+        screen.set_clip(None)
+        return dirty
+
+    def _paint(self, screen, layers):
+        screen.fill((0, 0, 0))
+        for entries in layers.values():
+            for text, position in entries:
+                screen.blit(self.text_cache.render(self.font, text), position)
+
+        if self.show_controls:
+            if self.help_overlay is None:
+                self.help_overlay = self.render_help_overlay()
+            screen.blit(self.help_overlay, (self.screen_width // 2, 0))
+
+    def render_help_overlay(self):
+        """Renders the translucent controls panel once; it is reused every frame."""
+        overlay = pygame.Surface(
+            (self.screen_width // 2, self.screen_height), pygame.SRCALPHA
+        )
+        overlay.fill((0, 0, 0, 128))
+
+        controls = [
+            i18n.t("controls.title"),
+            i18n.t("controls.pause"),
+            i18n.t("controls.navigate"),
+            i18n.t("controls.correct"),
+            i18n.t("controls.wrong"),
+            i18n.t("controls.video"),
+            i18n.t("controls.buzz"),
+            i18n.t("controls.help"),
+            i18n.t("controls.scores"),
+            i18n.t("controls.undo"),
+            i18n.t("controls.redo"),
+            i18n.t("controls.profile"),
+        ]
+
+        help_y = 50
+        for control in controls:
+            control_surface = self.font.render(control, True, (255, 255, 255))
+            overlay.blit(control_surface, (20, help_y))
+            help_y += 40
+        return overlay
+
+    def answer_correct(self, points=None):
+        if self.waiting_for_player is None:
+            return
+        points = self.CORRECT_ANSWER_POINTS if points is None else points
+        if self.song.video:
+            mixer.music.stop()
+            self.add_points(self.waiting_for_player, points)
+            self.play_video()
+        else:
+            self.add_points(self.waiting_for_player, points)
+            mixer.music.unpause()
+            self.is_paused = False
+            self.waiting_for_player = None
+
+    def answer_wrong(self, points=None):
+        if self.waiting_for_player is None:
+            return
+        points = self.WRONG_ANSWER_POINTS if points is None else points
+        self.add_points(self.waiting_for_player, -points)
+        self.resume_song()
+
+    def toggle_playback(self):
+        if self.is_video_playing:
+            self.video_player.toggle_pause()
+        elif self.is_paused:
+            self.resume_song()
+        else:
+            self.toggle_pause()
+
+    def handle_command(self, command):
+        """Runs a command from the remote control (see ``remote.COMMANDS``)."""
+        name = command["command"]
+        if name == "add_points":
+            player = command.get("player")
+            points = command.get("points")
+            if player != self.waiting_for_player or not isinstance(points, int):
+                return
+            if points > 0:
+                self.answer_correct(points)
+            elif points < 0:
+                self.answer_wrong(-points)
+        elif name == "toggle_pause":
+            self.toggle_playback()
+        elif name == "play_video":
+            if not self.is_video_playing:
+                mixer.music.stop()
+                self.play_video()
+        elif name == "undo":
+            self.undo_last_action()
+        elif name == "redo":
+            self.redo_last_action()
+        elif name in ("next_song", "previous_song", "next_category", "previous_category"):
+            getattr(self, name)()
+
+    def remote_state(self):
+        """Returns what remote scoreboards show; scores only while they are shown here."""
+        state = {
+            "playing": self.is_playing,
+            "players": [
+                {
+                    "name": player["name"],
+                    "score": player["score"] if self.show_scores else None,
+                }
+                for player in self.players
+            ],
+            "category": None,
+            "track": None,
+            "tracks": None,
+            "paused": self.is_paused,
+            "waiting_for_player": self.waiting_for_player,
+            "buzz_round": self.is_buzz_round_active,
+            "video": self.is_video_playing,
+        }
+        if self.song is not None:
+            state["category"] = self.song.category.name
+            state["track"] = self.current_song + 1
+            state["tracks"] = len(self.song.category)
+        return state
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_q:
-                if self.waiting_for_player is not None:
-                    current_song = self.songs_data["categories"][self.current_category]["songs"][self.current_song]
-                    if current_song.get("video", False) and current_song.get("video", False) != "false":
-                        mixer.music.stop()
-                        self.add_points(self.waiting_for_player, self.CORRECT_ANSWER_POINTS)
-                        self.play_video()
-                    else:
-                        self.add_points(self.waiting_for_player, self.CORRECT_ANSWER_POINTS)
-                        mixer.music.unpause()
-                        self.is_paused = False
-                        self.waiting_for_player = None
-            elif event.key == pygame.K_a and self.waiting_for_player is not None:
-                self.add_points(self.waiting_for_player, -self.WRONG_ANSWER_POINTS)
-                self.resume_song()
+                self.answer_correct()
+            elif event.key == pygame.K_a:
+                self.answer_wrong()
             elif event.key == pygame.K_SPACE:
-                if self.is_paused:
-                    self.resume_song()
-                else:
-                    if self.is_video_playing:
-                        self.stop_video()
-                    self.toggle_pause()
+                self.toggle_playback()
             elif event.key == pygame.K_RIGHT:
                 self.next_song()
             elif event.key == pygame.K_LEFT:
@@ -409,18 +632,24 @@ class Game:
                 self.next_category()
             elif event.key == pygame.K_DOWN:
                 self.previous_category()
-            elif event.key == pygame.K_1:
-                self.pause_for_player(0)
-            elif event.key == pygame.K_2:
-                self.pause_for_player(1)
-            elif event.key == pygame.K_3:
-                self.pause_for_player(2)
-            elif event.key == pygame.K_4:
-                self.pause_for_player(3)
+            elif (
+                pygame.K_1 <= event.key <= pygame.K_9
+                and event.key - pygame.K_1 < len(self.players)
+            ):
+                self.pause_for_player(event.key - pygame.K_1)
             elif event.key == pygame.K_ESCAPE:
                 self.is_playing = False
             elif event.key == pygame.K_h:
                 self.show_controls = not self.show_controls
+            elif event.key == pygame.K_c:
+                self.undo_last_action()
+            elif event.key == pygame.K_r:
+                self.redo_last_action()
+            elif event.key == pygame.K_p:
+                self.show_profile = not self.show_profile
+                # Without --profile, sections are only timed while the overlay is shown
+                self.profiler.enabled = self.show_profile or self.profiler.trace
+                self.profile_lines_time = 0
             elif event.key == pygame.K_v:
                 mixer.music.stop()
                 self.toggle_video()
@@ -434,54 +663,119 @@ class Game:
                 self.set_debug_message(scores_status)
 
     def start_buzz_round(self):
-        if not self.is_buzz_round_active:
-            self.buzz_controller.clear_button_states()
-            time.sleep(0.1)
-
-            self.is_buzz_round_active = True
-            self.buzz_start_time = pygame.time.get_ticks() / 1000.0
-            self.last_buzz_check = self.buzz_start_time
-            self.last_blink_time = self.buzz_start_time
-            self.blink_state = True
+        # Presses that arrived before this point are discarded by the reader;
+        # the round itself goes live on the next update() instead of sleeping here.
+        if not self.is_buzz_round_active and not self.is_buzz_round_pending:
+            self.buzz_controller.discard_events_before()
+            self.is_buzz_round_pending = True
             self.set_debug_message(i18n.t("press_buzz"))
-            for controller in self.available_controllers:
-                self.buzz_controller.light_set(controller, True)
+            self.buzz_controller.lights.blink(
+                self.available_controllers, self.blink_interval
+            )
+
+    def stop_buzz_round(self):
+        self.is_buzz_round_active = False
+        self.is_buzz_round_pending = False
+        self.buzz_controller.lights.off()
 
     def update(self):
         current_time = pygame.time.get_ticks() / 1000.0
-
-        if self.is_buzz_round_active:
-            if current_time - self.last_blink_time >= self.blink_interval:
-                self.last_blink_time = current_time
-                self.blink_state = not self.blink_state
-                for controller in self.available_controllers:
-                    self.buzz_controller.light_set(controller, self.blink_state)
-
-            if current_time - self.last_buzz_check >= self.buzz_check_interval:
-                self.last_buzz_check = current_time
-                button_states = self.buzz_controller.get_button_status()
-
-                if self.is_buzz_round_active:
-                    for controller in self.available_controllers:
-                        if button_states[controller]["red"]:
-                            self.is_buzz_round_active = False
-                            for c in self.available_controllers:
-                                self.buzz_controller.light_set(c, False)
-                            self.buzz_controller.light_set(controller, True)
-                            self.pause_for_player(controller)
-                            player_text = f"{i18n.t('player')} {controller + 1}"
-                            self.set_debug_message(
-                                f"¡{player_text} {i18n.t('player_pressed')}!"
-                            )
-                            return
+        # Drain every frame so presses made outside a round never leak into the next one
+        with self.profiler.section("buzz_events"):
+            buzz_events = self.buzz_controller.get_events()
+        with self.profiler.section("clip"):
+            self.update_clip()
+
+        if self.is_buzz_round_pending:
+            self.is_buzz_round_pending = False
+            self.is_buzz_round_active = True
+            self.buzz_start_time = current_time
+
+        presses = [
+            event
+            for event in buzz_events
+            if event.pressed
+            and event.button == "red"
+            and event.controller in self.available_controllers
+        ]
+        if self.is_buzz_round_active and presses:
+            winner, tied = self.buzz_arbiter.decide(presses)
+            decided_at = time.perf_counter()
+            controller = winner.controller
+            self.is_buzz_round_active = False
+            self.pause_for_player(controller)
+            self.buzz_stats.record(winner, tied, decided_at, time.perf_counter())
+            self.buzz_arbiter.observe(buzz_events)
+            self.journal.append("buzz", player=controller, tied=tied)
+            self.buzz_controller.lights.flash([controller])
+            player_text = f"{i18n.t('player')} {controller + 1}"
+            self.set_debug_message(
+                f"¡{player_text} {i18n.t('player_pressed')}!"
+            )
+            return
+        self.buzz_arbiter.observe(buzz_events)
 
         if self.is_video_playing:
-            self.update_video_frame()
+            with self.profiler.section("video"):
+                self.update_video_frame()
+
+    def post_buzz_event(self):
+        pygame.event.post(pygame.event.Event(BUZZ_EVENT))
+
+    def next_wakeup(self):
+        """Returns how many milliseconds the main loop may sleep.
+
+        The loop sleeps until the earliest of the next video frame, the
+        debug message expiring or the song excerpt ending. Buzzes and key
+        presses wake it up earlier through the event queue.
+
+        Returns:
+            int: Milliseconds to wait for events, 0 to run the next frame at full rate
+        """
+        if (
+            self.is_buzz_round_pending
+            or self.buzz_controller.events
+            or self.drawn_layers is None
+        ):
+            return 0
+        deadlines = [self.IDLE_WAKEUP_MS]
+        if self.show_profile:
+            deadlines.append(self.PROFILE_REFRESH_MS)
+        if self.is_video_playing and self.video_player is not None:
+            delay = self.video_player.next_frame_delay()
+            if delay is None:
+                return 0
+            deadlines.append(int(delay * 1000))
+        if self.debug_message:
+            remaining = (
+                self.debug_message_time
+                + self.MESSAGE_SHOW_TIMEOUT
+                - pygame.time.get_ticks()
+            )
+            if remaining >= 0:
+                deadlines.append(remaining + 1)
+        if self.clip_end_ms is not None and not self.is_paused:
+            deadlines.append(self.clip_end_ms - mixer.music.get_pos())
+        return max(0, min(deadlines))
 
     def cleanup(self):
+        self.audio_cache.close()
+        self.journal.close()
+        if self.buzz_stats.buzzes:
+            try:
+                self.buzz_stats.export(self.pack.directory / "buzz_stats.json")
+            except OSError as e:
+                print(f"Error: Could not write buzz statistics. Details: {e}")
+        stats = self.text_cache.stats()
+        print(
+            f"Text cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['entries']} entries"
+        )
         if self.buzz_controller:
-            for controller in range(4):
-                self.buzz_controller.light_set(controller, False)
+            self.buzz_controller.stop_reader()
+            self.buzz_controller.lights.shutdown()
+            self.buzz_controller.light_set_mask(0)
+            self.buzz_controller.flush_lights(force=True)
 
 
 def create_main_menu(game, screen_width, screen_height, game_title):
@@ -492,36 +786,27 @@ def create_main_menu(game, screen_width, screen_height, game_title):
         theme=pygame_menu.themes.THEME_DARK,
     )
 
-    def update_player1_name(value):
-        game.players[0]["name"] = value
-
-    def update_player2_name(value):
-        game.players[1]["name"] = value
-
-    def update_player3_name(value):
-        game.players[2]["name"] = value
+    def update_player_name(index):
+        def update(value):
+            game.players[index]["name"] = value
 
-    def update_player4_name(value):
-        game.players[3]["name"] = value
+        return update
 
     def start_game():
         game.start_game()
         menu.disable()
 
-    menu.add.text_input(
-        f"{i18n.t('player')} 1: ", default="", onchange=update_player1_name
-    )
-    menu.add.text_input(
-        f"{i18n.t('player')} 2: ", default="", onchange=update_player2_name
-    )
-    menu.add.text_input(
-        f"{i18n.t('player')} 3: ", default="", onchange=update_player3_name
-    )
-    menu.add.text_input(
-        f"{i18n.t('player')} 4: ", default="", onchange=update_player4_name
-    )
+    for index in range(len(game.players)):
+        menu.add.text_input(
+            f"{i18n.t('player')} {index + 1}: ",
+            default=game.players[index]["name"],
+            onchange=update_player_name(index),
+        )
     menu.add.button(i18n.t("play"), start_game)
-    menu.add.button(i18n.t("exit"), pygame_menu.events.EXIT)
+    # Quit through the game loop so it can clean up the controller and caches
+    menu.add.button(
+        i18n.t("exit"), lambda: pygame.event.post(pygame.event.Event(pygame.QUIT))
+    )
 
     version_label = menu.add.label(
         f"{i18n.t('version')} {game.version}", align=pygame_menu.locals.ALIGN_RIGHT
@@ -529,4 +814,3 @@ def create_main_menu(game, screen_width, screen_height, game_title):
     version_label.set_position(0, screen_height - 30)
 
     return menu
-    return menu
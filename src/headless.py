@@ -0,0 +1,218 @@
+"""Runs the game without a display, a sound card or a Buzz! dongle.
+
+``HeadlessGame`` drives a real ``Game`` with fake Buzz! dongles that
+replay button presses, a ``mixer.music`` stand-in that plays nothing and
+an offscreen surface. It is used by the tests and by
+``benchmarks/bench_game_loop.py``.
+"""
+
+import json
+import os
+import queue
+import time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import game as game_module
+from buzz_controller import BUTTON_MASKS, CONTROLLERS_PER_DEVICE, BuzzController
+from i18n_config import setup_i18n
+
+
+class FakeBuzzDevice:
+    """Stands in for a ``hid.Device`` of one dongle with four controllers.
+
+    Every ``press``/``release`` queues the report the dongle would send;
+    ``read`` blocks up to its timeout like hidapi does.
+    """
+
+    def __init__(self):
+        self.nonblocking = 0
+        self.bits = 0
+        self.written = []
+        self.pushed_at = None
+        self._reports = queue.Queue()
+
+    def press(self, controller, button="red"):
+        self.bits |= BUTTON_MASKS[controller][button]
+        self._push()
+
+    def release(self, controller, button="red"):
+        self.bits &= ~BUTTON_MASKS[controller][button]
+        self._push()
+
+    def tap(self, controller, button="red"):
+        self.press(controller, button)
+        self.release(controller, button)
+
+    def _push(self):
+        self.pushed_at = time.perf_counter()
+        self._reports.put(
+            bytes([0x7F, 0x00, self.bits & 0xFF, (self.bits >> 8) & 0xFF, (self.bits >> 16) & 0x0F])
+        )
+
+    def read(self, size, timeout=0):
+        try:
+            return self._reports.get(timeout=(timeout or 0) / 1000)[:size]
+        except queue.Empty:
+            return b""
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        return len(data)
+
+    def close(self):
+        pass
+
+
+class NullMusic:
+    """``pygame.mixer.music`` look-alike that keeps time but plays nothing."""
+
+    def __init__(self):
+        self.loaded = None
+        self.volume = 1.0
+        self._started = None
+        self._paused_at = None
+
+    def load(self, file, namehint=""):
+        self.loaded = file
+
+    def play(self, loops=0, start=0.0, fade_ms=0):
+        self._started = time.perf_counter()
+        self._paused_at = None
+
+    def stop(self):
+        self._started = None
+        self._paused_at = None
+
+    def fadeout(self, time_ms):
+        self.stop()
+
+    def pause(self):
+        if self._started is not None and self._paused_at is None:
+            self._paused_at = time.perf_counter()
+
+    def unpause(self):
+        if self._paused_at is not None:
+            self._started += time.perf_counter() - self._paused_at
+            self._paused_at = None
+
+    def get_busy(self):
+        return self._started is not None and self._paused_at is None
+
+    def get_pos(self):
+        if self._started is None:
+            return -1
+        now = self._paused_at or time.perf_counter()
+        return int((now - self._started) * 1000)
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def get_volume(self):
+        return self.volume
+
+
+class NullMixer:
+    def __init__(self):
+        self.music = NullMusic()
+
+
+def make_pack(directory, categories=3, songs_per_category=10):
+    """Writes a pack of empty song files and returns its directory."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    data = {"categories": []}
+    for category in range(categories):
+        songs = []
+        for song in range(songs_per_category):
+            file = f"song_{category:03d}_{song:04d}.mp3"
+            (directory / file).write_bytes(b"\0" * 1024)
+            songs.append({"title": f"Song {category}.{song}", "file": file, "video": False})
+        data["categories"].append({"name": f"Category {category}", "songs": songs})
+    with open(directory / "songs.json", "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    return directory
+
+
+class HeadlessGame:
+    """A ``Game`` wired to fake dongles, a null mixer and an offscreen surface.
+
+    Args:
+        pack_dir (Path): Song pack directory, e.g. from ``make_pack``
+        dongles (int): Number of fake Buzz! dongles (four controllers each)
+        screen_size (tuple): Size of the offscreen surface
+    """
+
+    def __init__(self, pack_dir, dongles=1, screen_size=(800, 600)):
+        pygame.display.init()
+        pygame.font.init()
+        setup_i18n()
+        self._mixer = game_module.mixer
+        game_module.mixer = NullMixer()
+        self.music = game_module.mixer.music
+        self.devices = [FakeBuzzDevice() for _ in range(dongles)]
+        self.screen = pygame.Surface(screen_size)
+        self.frame_times = []
+        self.game = game_module.Game(
+            *screen_size,
+            song_pack=str(Path(pack_dir).absolute()),
+            buzz_controller=BuzzController(devices=self.devices),
+        )
+
+    def press(self, controller, button="red"):
+        device, local = divmod(controller, CONTROLLERS_PER_DEVICE)
+        self.devices[device].press(local, button)
+
+    def release(self, controller, button="red"):
+        device, local = divmod(controller, CONTROLLERS_PER_DEVICE)
+        self.devices[device].release(local, button)
+
+    def tap(self, controller, button="red"):
+        device, local = divmod(controller, CONTROLLERS_PER_DEVICE)
+        self.devices[device].tap(local, button)
+
+    def key(self, key):
+        """Queues a key press for the next ``step``."""
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=""))
+
+    def step(self, wait=False):
+        """Runs one iteration of the main loop and records its frame time.
+
+        Args:
+            wait (bool): Sleep until ``Game.next_wakeup`` like the real
+                loop does, instead of running the next frame immediately
+
+        Returns:
+            list: What ``Game.draw`` returned
+        """
+        timeout = self.game.next_wakeup() if wait else 0
+        if timeout:
+            events = [pygame.event.wait(timeout)] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+        start = time.perf_counter()
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.game.handle_event(event)
+        self.game.update()
+        dirty_rects = self.game.draw(self.screen)
+        self.frame_times.append(time.perf_counter() - start)
+        return dirty_rects
+
+    def run_until(self, predicate, timeout=1.0, wait=True):
+        """Steps until ``predicate()`` is true; returns False on timeout."""
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            if time.perf_counter() > deadline:
+                return False
+            self.step(wait)
+        return True
+
+    def close(self):
+        self.game.cleanup()
+        game_module.mixer = self._mixer
+        pygame.display.quit()
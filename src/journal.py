@@ -0,0 +1,228 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+class ShowState:
+    """Scores, names and position of a show, derived by folding journal records.
+
+    Every ``score`` record is pushed on the undo stack; ``undo`` moves the
+    latest one to the redo stack and reverts its points, ``redo`` moves it
+    back. A new score clears the redo stack.
+    """
+
+    def __init__(self, player_count):
+        self.names = [""] * player_count
+        self.scores = [0] * player_count
+        self.category = 0
+        self.song = 0
+        self.seq = 0
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def apply(self, record):
+        """Folds one record into the state.
+
+        Returns:
+            dict: The score record an ``undo``/``redo`` affected, otherwise None
+        """
+        self.seq = record.get("seq", self.seq)
+        kind = record["type"]
+        if kind == "names":
+            for index, name in enumerate(record["names"][: len(self.names)]):
+                self.names[index] = name
+        elif kind == "navigate":
+            self.category = record["category"]
+            self.song = record["song"]
+        elif kind == "score":
+            score = {"player": record["player"], "points": record["points"]}
+            self.scores[score["player"]] += score["points"]
+            self.undo_stack.append(score)
+            self.redo_stack.clear()
+        elif kind == "undo" and self.undo_stack:
+            score = self.undo_stack.pop()
+            self.scores[score["player"]] -= score["points"]
+            self.redo_stack.append(score)
+            return score
+        elif kind == "redo" and self.redo_stack:
+            score = self.redo_stack.pop()
+            self.scores[score["player"]] += score["points"]
+            self.undo_stack.append(score)
+            return score
+        return None
+
+    def to_dict(self):
+        return {
+            "names": list(self.names),
+            "scores": list(self.scores),
+            "category": self.category,
+            "song": self.song,
+            "seq": self.seq,
+            "undo_stack": list(self.undo_stack),
+            "redo_stack": list(self.redo_stack),
+        }
+
+    @classmethod
+    def from_dict(cls, data, player_count):
+        state = cls(player_count)
+        count = min(player_count, len(data["scores"]))
+        state.names[:count] = data["names"][:count]
+        state.scores[:count] = data["scores"][:count]
+        state.category = data["category"]
+        state.song = data["song"]
+        state.seq = data["seq"]
+        state.undo_stack = [s for s in data["undo_stack"] if s["player"] < player_count]
+        state.redo_stack = [s for s in data["redo_stack"] if s["player"] < player_count]
+        return state
+
+
+class Journal:
+    """Append-only JSON lines log of a show with periodic snapshots.
+
+    ``append`` only queues the record; a writer thread writes and fsyncs
+    the queue in batches every ``flush_interval`` seconds, so the game
+    loop never waits for the disk. Every ``snapshot_interval`` records the
+    folded state is saved next to the journal together with the journal
+    offset it covers, so ``replay`` only folds the records after it.
+    """
+
+    def __init__(self, path, state, flush_interval=0.5, snapshot_interval=200):
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_name(self.path.name + ".snapshot")
+        self.state = state
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self._pending = []
+        self._condition = threading.Condition()
+        self._running = True
+        # Open for the whole life of the journal; close() closes it
+        self._file = open(self.path, "a+b")  # noqa: SIM115
+        if self._file.seek(0, os.SEEK_END):
+            self._file.seek(-1, os.SEEK_END)
+            if self._file.read(1) != b"\n":
+                # A crash cut the last record short: start the next one on its own line
+                self._file.write(b"\n")
+        self._thread = threading.Thread(
+            target=self._run, name="journal-writer", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def start(cls, path, player_count, resume=False, **kwargs):
+        """Opens the journal at ``path``, replaying it when ``resume`` is set.
+
+        A new show moves an existing journal aside to
+        ``<stem>-<YYYYmmdd-HHMMSS><suffix>`` instead of overwriting it, so
+        every earlier show is kept.
+        """
+        path = Path(path)
+        if resume:
+            state = cls.replay(path, player_count)
+        else:
+            state = ShowState(player_count)
+            if path.exists():
+                os.replace(path, _archive_path(path))
+            snapshot = path.with_name(path.name + ".snapshot")
+            if snapshot.exists():
+                snapshot.unlink()
+        return cls(path, state, **kwargs)
+
+    @staticmethod
+    def replay(path, player_count):
+        """Returns the ``ShowState`` at the end of the journal at ``path``."""
+        path = Path(path)
+        state = ShowState(player_count)
+        offset = 0
+        try:
+            with open(path.with_name(path.name + ".snapshot"), "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+            if snapshot["offset"] <= path.stat().st_size:
+                state = ShowState.from_dict(snapshot["state"], player_count)
+                offset = snapshot["offset"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        try:
+            with open(path, "rb") as file:
+                file.seek(offset)
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash may have cut a record short; later ones are still good
+                        continue
+                    if record.get("player", 0) < player_count:
+                        state.apply(record)
+        except FileNotFoundError:
+            pass
+        return state
+
+    def append(self, kind, **data):
+        """Folds a new record into ``self.state`` and queues it for writing.
+
+        Returns:
+            dict: Whatever ``ShowState.apply`` returned
+        """
+        record = {"seq": self.state.seq + 1, "t": round(time.time(), 3), "type": kind, **data}
+        result = self.state.apply(record)
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._condition:
+            self._pending.append(line)
+            if record["seq"] % self.snapshot_interval == 0:
+                self._pending.append(self.state.to_dict())
+        return result
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._running:
+                    self._condition.wait(self.flush_interval)
+                pending, self._pending = self._pending, []
+                running = self._running
+            if pending:
+                try:
+                    self._write(pending)
+                except OSError as e:
+                    print(f"Error: Could not write the journal {self.path}. Details: {e}")
+            if not running:
+                return
+
+    def _write(self, pending):
+        for item in pending:
+            if isinstance(item, bytes):
+                self._file.write(item)
+                continue
+            self._sync()
+            snapshot = {"offset": self._file.tell(), "state": item}
+            temporary = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(snapshot, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.snapshot_path)
+        self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """Writes everything still queued and closes the journal."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+        self._file.close()
+
+
+def _archive_path(path):
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(path.stat().st_mtime))
+    archive = path.with_name(f"{path.stem}-{stamp}{path.suffix}")
+    number = 1
+    while archive.exists():
+        number += 1
+        archive = path.with_name(f"{path.stem}-{stamp}-{number}{path.suffix}")
+    return archive
@@ -0,0 +1,251 @@
+"""Measures the loudness of every track in a song pack without re-encoding.
+
+Each file is decoded by ffmpeg and streamed to NumPy in one second chunks,
+so memory use does not depend on track length. ffmpeg also applies the
+two ITU-R BS.1770 K-weighting filters, and the gated integrated loudness
+(LUFS) and sample peak are computed here. Results are cached in
+``data/<pack>/loudness.json`` by content hash. A file whose size and
+modification time did not change is not even re-read, so re-analyzing a
+large pack after adding a few songs only decodes the new ones.
+
+Usage: uv run src/loudness.py pack_01 [--target -23] [--jobs 4]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ANALYSIS_RATE = 48000
+SUBBLOCK = ANALYSIS_RATE // 10  # 100 ms, a quarter of a 400 ms gating block
+CACHE_NAME = "loudness.json"
+# Lower than the pack compiler's -16 LUFS on purpose: set_volume can only
+# attenuate, so a quiet target lets most tracks actually reach it
+DEFAULT_TARGET = -23.0
+# Channels 0-1 are the plain signal (for the peak), 2-3 the K-weighted one
+FILTERS = (
+    "[0:a]aformat=sample_fmts=s16:channel_layouts=stereo,asplit[plain][weighted];"
+    "[weighted]highshelf=f=1681.97:g=4:t=q:w=0.7071,highpass=f=38.14:poles=2[k];"
+    "[plain][k]amerge=inputs=2"
+)
+
+
+def integrated_loudness(subblock_energies):
+    """Returns the gated integrated loudness (LUFS) of 100 ms energies.
+
+    Args:
+        subblock_energies (ndarray): Per 100 ms sub-block, the sum over
+            channels of the mean square of the K-weighted signal
+    """
+    energies = np.asarray(subblock_energies, dtype=np.float64)
+    if len(energies) < 4:
+        return -math.inf
+    # 400 ms blocks with 75 % overlap
+    blocks = np.convolve(energies, np.full(4, 0.25), mode="valid")
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10 * np.log10(blocks)
+    blocks = blocks[loudness > -70.0]
+    if not len(blocks):
+        return -math.inf
+    relative_gate = -0.691 + 10 * np.log10(blocks.mean()) - 10.0
+    with np.errstate(divide="ignore"):
+        blocks = blocks[-0.691 + 10 * np.log10(blocks) > relative_gate]
+    return float(-0.691 + 10 * np.log10(blocks.mean()))
+
+
+def chunk_energies(samples, leftover):
+    """Turns a chunk of ffmpeg output into 100 ms sub-block energies.
+
+    Args:
+        samples (ndarray): int16 frames of the four ``FILTERS`` channels
+        leftover (ndarray): K-weighted samples of the previous chunk that
+            did not fill a whole sub-block, shape ``(n, 2)``
+
+    Returns:
+        tuple: The energies of the whole sub-blocks, the sample peak of the
+        chunk and the K-weighted samples left over for the next chunk
+    """
+    peak = int(np.abs(samples[:, :2].astype(np.int32)).max()) if len(samples) else 0
+    weighted = np.concatenate([leftover, samples[:, 2:] / 32768.0])
+    whole = len(weighted) // SUBBLOCK * SUBBLOCK
+    squares = weighted[:whole].reshape(-1, SUBBLOCK, 2) ** 2
+    return squares.mean(axis=1).sum(axis=1), peak, weighted[whole:]
+
+
+def measure_file(path):
+    """Decodes ``path`` and returns its integrated loudness and peak (dBFS)."""
+    process = subprocess.Popen(
+        ["ffmpeg", "-hide_banner", "-v", "error", "-i", str(path), "-vn",
+         "-filter_complex", FILTERS, "-ar", str(ANALYSIS_RATE),
+         "-f", "s16le", "-"],
+        stdout=subprocess.PIPE,
+    )
+    chunk_bytes = SUBBLOCK * 10 * 4 * 2
+    energies = []
+    peak = 0
+    leftover = np.empty((0, 2), dtype=np.float64)
+    try:
+        while True:
+            data = process.stdout.read(chunk_bytes)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=np.int16).reshape(-1, 4)
+            chunk, chunk_peak, leftover = chunk_energies(samples, leftover)
+            energies.extend(chunk)
+            peak = max(peak, chunk_peak)
+    except BaseException:
+        # Do not leave ffmpeg running (or a zombie) behind
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        process.stdout.close()
+    if process.wait() != 0:
+        raise ValueError(f"ffmpeg could not decode {path}")
+    peak_db = 20 * math.log10(peak / 32768.0) if peak else -math.inf
+    return integrated_loudness(energies), peak_db
+
+
+def track_gain(loudness, peak, target=DEFAULT_TARGET):
+    """Returns the gain (dB) that brings a track to ``target`` without clipping."""
+    if loudness is None or loudness == -math.inf:
+        return 0.0
+    return min(target - loudness, -peak)
+
+
+def gain_to_volume(gain):
+    """Converts a gain in dB to a ``mixer.music.set_volume`` value.
+
+    The mixer cannot amplify, so tracks quieter than the target play at
+    full volume.
+    """
+    return min(1.0, 10 ** (gain / 20))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cache(pack_dir):
+    try:
+        with open(Path(pack_dir) / CACHE_NAME, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"files": {}, "hashes": {}}
+
+
+def load_gains(pack_dir):
+    """Returns ``{song file: gain in dB}`` from the pack's loudness cache."""
+    return {
+        relative: entry["gain"]
+        for relative, entry in load_cache(pack_dir)["files"].items()
+        if "gain" in entry
+    }
+
+
+def analyze_pack(pack_dir, target=DEFAULT_TARGET, jobs=None, measure=measure_file):
+    """Updates the loudness cache of ``pack_dir`` and returns analysis counts."""
+    pack_dir = Path(pack_dir)
+    with open(pack_dir / "songs.json", "r", encoding="utf-8") as file:
+        songs_data = json.load(file)
+    cache = load_cache(pack_dir)
+    files = {}
+    hashes = cache["hashes"]
+    to_measure = {}
+    stats = {"analyzed": 0, "cached": 0, "failed": 0}
+
+    relatives = {
+        song["file"]
+        for category in songs_data["categories"]
+        for song in category["songs"]
+        if song.get("file")
+    }
+    for relative in sorted(relatives):
+        path = pack_dir / relative
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            print(f"Error: File not found {path}")
+            stats["failed"] += 1
+            continue
+        entry = cache["files"].get(relative, {})
+        if entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns:
+            digest = entry["hash"]
+        else:
+            digest = file_hash(path)
+        files[relative] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest,
+        }
+        if digest in hashes:
+            stats["cached"] += 1
+        else:
+            to_measure.setdefault(digest, path)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = {
+            digest: executor.submit(_safe_measure, measure, path)
+            for digest, path in to_measure.items()
+        }
+    for digest, future in futures.items():
+        result = future.result()
+        if result is None:
+            stats["failed"] += 1
+            continue
+        # JSON has no infinity: silent tracks are stored as None
+        loudness, peak = (value if math.isfinite(value) else None for value in result)
+        hashes[digest] = {"loudness": loudness, "peak": peak}
+        stats["analyzed"] += 1
+
+    for relative, entry in files.items():
+        measured = hashes.get(entry["hash"])
+        if measured:
+            gain = track_gain(measured["loudness"], measured["peak"], target)
+            entry["gain"] = round(gain, 2)
+    used = {entry["hash"] for entry in files.values()}
+    cache = {
+        "target": target,
+        "files": files,
+        "hashes": {digest: value for digest, value in hashes.items() if digest in used},
+    }
+    with open(pack_dir / CACHE_NAME, "w", encoding="utf-8") as file:
+        json.dump(cache, file, indent=4)
+    return stats
+
+
+def _safe_measure(measure, path):
+    try:
+        return measure(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not analyze {path}. Details: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze the loudness of a song pack")
+    parser.add_argument("pack", help="Song package directory inside data/")
+    parser.add_argument(
+        "--target", type=float, default=DEFAULT_TARGET, help="Target loudness in LUFS"
+    )
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    stats = analyze_pack(Path("data") / args.pack, args.target, args.jobs)
+    print(f"{stats['analyzed']} analyzed, {stats['cached']} cached, {stats['failed']} failed")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
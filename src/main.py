@@ -4,8 +4,13 @@ import i18n
 import pygame
 from pygame import mixer
 
-from game import Game, create_main_menu
+from buzz_stats import TIE_BREAKS
+from game import REMOTE_EVENT, Game, create_main_menu
 from i18n_config import change_language, setup_i18n
+from pack_compiler import CHANNELS, SAMPLE_RATE
+from profiler import Profiler
+from remote import RemoteServer, is_loopback, parse_address
+from video import SCALING_POLICIES
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -19,27 +24,108 @@ def main():
         default="pack_01",
         help="Song package directory to use (default: pack_01)",
     )
+    parser.add_argument(
+        "--video-scaling",
+        choices=SCALING_POLICIES,
+        default="fit",
+        help="How videos are scaled to the screen: fit (letterbox), fill (stretch) or native (never upscale)",
+    )
+    parser.add_argument(
+        "--preflight",
+        action="store_true",
+        help="Check every file of the song pack before starting (see make validate-pack)",
+    )
+    parser.add_argument(
+        "--tie-break",
+        choices=TIE_BREAKS,
+        default="random",
+        help="Who wins when buzzes arrive in the same controller report (default: random)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Restore names, scores and the current song from the last show's journal",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile.json",
+        metavar="PATH",
+        help="Time the game loop and write a Chrome trace to PATH on exit (default: profile.json)",
+    )
+    parser.add_argument(
+        "--remote",
+        metavar="[HOST:]PORT",
+        help="Serve the remote control and live scoreboard (e.g. 8765, or 0.0.0.0:8765 for phones on the network)",
+    )
+    parser.add_argument(
+        "--remote-token",
+        help="Secret that remote commands must send as 'Authorization: Bearer <token>'",
+    )
     args = parser.parse_args()
+    if args.remote:
+        try:
+            remote_address = parse_address(args.remote)
+        except ValueError as e:
+            parser.error(f"--remote: {e}")
+        if not is_loopback(remote_address[0]) and not args.remote_token:
+            parser.error("--remote on a network address needs --remote-token")
 
     setup_i18n()
 
     GAME_TITLE = i18n.t("game_title")
 
     pygame.init()
-    mixer.init(frequency=44100, size=-16, channels=2, buffer=4096)
+    mixer.init(frequency=SAMPLE_RATE, size=-16, channels=CHANNELS, buffer=4096)
     mixer.music.set_volume(1.0)
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
     pygame.display.set_caption(GAME_TITLE)
 
-    game = Game(SCREEN_WIDTH, SCREEN_HEIGHT, song_pack=args.pack)
+    profiler = Profiler(trace=args.profile is not None)
+    game = Game(
+        SCREEN_WIDTH,
+        SCREEN_HEIGHT,
+        song_pack=args.pack,
+        video_scaling=args.video_scaling,
+        preflight=args.preflight,
+        resume=args.resume,
+        tie_break=args.tie_break,
+        profiler=profiler,
+    )
     menu = create_main_menu(game, SCREEN_WIDTH, SCREEN_HEIGHT, GAME_TITLE)
+    game.warm_up()
+    game.show_idle_lights()
+
+    remote = None
+    if args.remote:
+        remote = RemoteServer(
+            *remote_address,
+            token=args.remote_token,
+            on_command=lambda: pygame.event.post(pygame.event.Event(REMOTE_EVENT)),
+        )
+        if remote.start():
+            print(
+                f"Scoreboard on http://{remote.host}:{remote.port}/, "
+                f"host controls on http://{remote.host}:{remote.port}/#control"
+            )
+        else:
+            remote = None
 
     running = True
     clock = pygame.time.Clock()
 
     try:
         while running:
-            for event in pygame.event.get():
+            timeout = game.next_wakeup() if game.is_playing else 0
+            with profiler.section("idle"):
+                if timeout:
+                    # Nothing animates: sleep until the next deadline or event
+                    events = [pygame.event.wait(timeout)] + pygame.event.get()
+                else:
+                    clock.tick(60)
+                    events = pygame.event.get()
+
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
@@ -48,18 +134,43 @@ def main():
                     elif game.is_playing:
                         game.handle_event(event)
 
-            screen.fill((0, 0, 0))
+            if remote is not None:
+                remote.accepting_commands = game.is_playing
+                for command in remote.poll():
+                    # Commands queued as the menu opened have no show to act on
+                    if game.is_playing:
+                        game.handle_command(command)
+
+            if not game.is_playing:
+                if not menu.is_enabled():
+                    menu.enable()
+                # Starting the game from the menu disables it
+                with profiler.section("menu"):
+                    menu.update(events)
 
             if not game.is_playing:
-                menu.mainloop(screen)
+                with profiler.section("menu"):
+                    screen.fill((0, 0, 0))
+                    menu.draw(screen)
+                with profiler.section("display"):
+                    pygame.display.flip()
             else:
                 game.update()
-                game.draw(screen)
-
-            pygame.display.flip()
-            clock.tick(60)
+                dirty_rects = game.draw(screen)
+                with profiler.section("display"):
+                    if dirty_rects is None:
+                        pygame.display.flip()
+                    elif dirty_rects:
+                        pygame.display.update(dirty_rects)
+            if remote is not None:
+                remote.publish(game.remote_state())
     finally:
+        if remote is not None:
+            remote.stop()
         game.cleanup()
+        if args.profile:
+            profiler.dump(args.profile)
+            print(f"Profile written to {args.profile}")
         pygame.quit()
 
 
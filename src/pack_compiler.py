@@ -0,0 +1,215 @@
+"""Compiles a song pack into uniform, loudness-normalized assets.
+
+Every audio file is transcoded to Ogg Vorbis and every video to H.264/AAC
+MP4, all at the sample rate and channel count the mixer is opened with,
+and normalized to EBU R128 loudness with ffmpeg's two-pass ``loudnorm``.
+Files are processed in parallel and skipped when neither their content
+nor the settings changed since the last run.
+
+Usage: uv run src/pack_compiler.py pack_01 [--output pack_01_compiled] [--jobs 4]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Must match the mixer.init() call in main.py so nothing is resampled at play time
+SAMPLE_RATE = 44100
+CHANNELS = 2
+LOUDNESS_TARGET = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+
+AUDIO_ARGS = ["-vn", "-c:a", "libvorbis", "-q:a", "5"]
+VIDEO_ARGS = [
+    "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+    "-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart",
+]
+OUTPUT_SUFFIXES = {"file": ".ogg", "video": ".mp4"}
+MANIFEST_NAME = "manifest.json"
+
+
+def settings_key(kind):
+    """Returns a string that changes whenever the output for ``kind`` would."""
+    args = AUDIO_ARGS if kind == "file" else VIDEO_ARGS
+    return json.dumps([SAMPLE_RATE, CHANNELS, LOUDNESS_TARGET, args], sort_keys=True)
+
+
+def file_hash(path, kind):
+    digest = hashlib.sha256(settings_key(kind).encode())
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def has_audio(source):
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a",
+         "-show_entries", "stream=index", "-of", "csv=p=0", str(source)],
+        capture_output=True, text=True, check=True,
+    )
+    return bool(result.stdout.strip())
+
+
+def measure_loudness(source):
+    """Runs the first ``loudnorm`` pass and returns its measurements.
+
+    Raises:
+        ValueError: If ffmpeg printed no measurement
+    """
+    target = ":".join(f"{key}={value}" for key, value in LOUDNESS_TARGET.items())
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-i", str(source), "-vn",
+         "-af", f"loudnorm={target}:print_format=json", "-f", "null", "-"],
+        capture_output=True, text=True, check=True,
+    )
+    blocks = re.findall(r"\{[^{}]*\}", result.stderr)
+    if not blocks:
+        raise ValueError(f"loudnorm printed no measurement for {source}")
+    return json.loads(blocks[-1])
+
+
+def transcode(source, output, kind):
+    """Transcodes ``source``; videos without an audio track are not normalized."""
+    filters = []
+    if kind == "file" or has_audio(source):
+        measured = measure_loudness(source)
+        target = ":".join(f"{key}={value}" for key, value in LOUDNESS_TARGET.items())
+        loudnorm = (
+            f"loudnorm={target}:measured_I={measured['input_i']}"
+            f":measured_TP={measured['input_tp']}:measured_LRA={measured['input_lra']}"
+            f":measured_thresh={measured['input_thresh']}"
+            f":offset={measured['target_offset']}:linear=true"
+        )
+        filters = ["-af", loudnorm]
+    args = AUDIO_ARGS if kind == "file" else VIDEO_ARGS
+    subprocess.run(
+        ["ffmpeg", "-hide_banner", "-v", "error", "-y", "-i", str(source),
+         *filters, "-ar", str(SAMPLE_RATE), "-ac", str(CHANNELS),
+         *args, str(output)],
+        check=True,
+    )
+
+
+def compile_asset(source, output, kind, previous_hash):
+    """Transcodes one asset unless it is unchanged.
+
+    Returns:
+        tuple: Content hash and whether the asset was transcoded
+    """
+    digest = file_hash(source, kind)
+    if digest == previous_hash and Path(output).exists():
+        return digest, False
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    transcode(source, output, kind)
+    return digest, True
+
+
+def compile_pack(pack_dir, output_dir, jobs=None, executor=None):
+    """Compiles ``pack_dir`` into ``output_dir``.
+
+    Args:
+        pack_dir (Path): Pack directory containing songs.json
+        output_dir (Path): Where the compiled pack is written
+        jobs (int): Worker processes, defaults to the CPU count
+        executor (Executor): Executor to use instead of a process pool
+
+    Returns:
+        dict: Counts of compiled, skipped and failed assets
+    """
+    pack_dir = Path(pack_dir)
+    output_dir = Path(output_dir)
+    with open(pack_dir / "songs.json", "r", encoding="utf-8") as file:
+        songs_data = json.load(file)
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = {}
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            previous = json.load(file).get("assets", {})
+    previous = {kind: previous.get(kind, {}) for kind in OUTPUT_SUFFIXES}
+
+    assets = {}
+    for category in songs_data["categories"]:
+        for song in category["songs"]:
+            for kind, suffix in OUTPUT_SUFFIXES.items():
+                relative = song.get(kind)
+                if relative and relative != "false":
+                    assets[(relative, kind)] = str(Path(relative).with_suffix(suffix))
+
+    stats = {"compiled": 0, "skipped": 0, "failed": 0}
+    manifest = {kind: {} for kind in OUTPUT_SUFFIXES}
+    executor = executor or ProcessPoolExecutor(max_workers=jobs)
+    with executor:
+        futures = {}
+        for (relative, kind), output in assets.items():
+            source = pack_dir / relative
+            if not source.exists():
+                print(f"Error: File not found {source}")
+                stats["failed"] += 1
+                continue
+            previous_hash = previous[kind].get(relative, {}).get("hash")
+            future = executor.submit(
+                compile_asset, source, output_dir / output, kind, previous_hash
+            )
+            futures[future] = (relative, kind, output)
+        for future, (relative, kind, output) in futures.items():
+            try:
+                digest, compiled = future.result()
+            except (OSError, subprocess.CalledProcessError, ValueError, KeyError) as e:
+                print(f"Error: Could not compile {relative}. Details: {e}")
+                stats["failed"] += 1
+                continue
+            stats["compiled" if compiled else "skipped"] += 1
+            manifest[kind][relative] = {"hash": digest, "output": output}
+            print(f"{'Compiled' if compiled else 'Unchanged'}: {relative} -> {output}")
+
+    compiled_data = json.loads(json.dumps(songs_data))
+    for category in compiled_data["categories"]:
+        for song in category["songs"]:
+            for kind in OUTPUT_SUFFIXES:
+                entry = manifest[kind].get(song.get(kind) or "")
+                if entry:
+                    song[kind] = entry["output"]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / "songs.json", "w", encoding="utf-8") as file:
+        json.dump(compiled_data, file, ensure_ascii=False, indent=4)
+    with open(manifest_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "sample_rate": SAMPLE_RATE,
+                "channels": CHANNELS,
+                "loudness": LOUDNESS_TARGET,
+                "assets": manifest,
+            },
+            file,
+            indent=4,
+        )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a song pack")
+    parser.add_argument("pack", help="Song package directory inside data/")
+    parser.add_argument(
+        "--output", help="Output pack directory inside data/ (default: <pack>_compiled)"
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    output = args.output or f"{args.pack}_compiled"
+    stats = compile_pack(Path("data") / args.pack, Path("data") / output, args.jobs)
+    print(
+        f"{stats['compiled']} compiled, {stats['skipped']} unchanged, "
+        f"{stats['failed']} failed. Play it with: uv run src/main.py --pack {output}"
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Checks a song pack before a show.
+
+Validates the ``songs.json`` schema, that every ``file`` and ``video``
+exists, and probes each asset with ffprobe for its codec and duration.
+Probes run concurrently on a thread pool (ffprobe is a subprocess, so
+threads are enough, and they hide network storage latency). Results are
+cached in ``data/<pack>/probe.json`` by file size and modification time,
+so only new or changed files are probed again.
+
+Usage: uv run src/pack_validator.py pack_01 [--jobs 16]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from song_pack import SongPack
+
+CACHE_NAME = "probe.json"
+DEFAULT_JOBS = 16
+ASSET_STREAMS = {"file": "audio", "video": "video"}
+
+
+def validate_schema(data):
+    """Returns a list of schema problems in parsed ``songs.json`` data."""
+    if not isinstance(data, dict) or not isinstance(data.get("categories"), list):
+        return ["songs.json must contain a list of categories"]
+    errors = []
+    for category_index, category in enumerate(data["categories"]):
+        where = f"category {category_index + 1}"
+        if not isinstance(category, dict):
+            errors.append(f"{where}: must be an object")
+            continue
+        if not isinstance(category.get("name"), str):
+            errors.append(f"{where}: missing name")
+        if not isinstance(category.get("songs"), list):
+            errors.append(f"{where}: missing list of songs")
+            continue
+        for song_index, song in enumerate(category["songs"]):
+            song_where = f"{where}, song {song_index + 1}"
+            if not isinstance(song, dict):
+                errors.append(f"{song_where}: must be an object")
+                continue
+            for key in ("title", "file"):
+                if not isinstance(song.get(key), str) or not song[key]:
+                    errors.append(f"{song_where}: missing {key}")
+            video = song.get("video")
+            if video not in (None, False) and not isinstance(video, str):
+                errors.append(f"{song_where}: video must be a path or false")
+            for key in ("start", "duration", "fade"):
+                value = song.get(key)
+                if value is not None and (
+                    isinstance(value, bool)
+                    or not isinstance(value, (int, float))
+                    or value < 0
+                ):
+                    errors.append(f"{song_where}: {key} must be a positive number")
+    return errors
+
+
+def probe_file(path):
+    """Runs ffprobe on ``path`` and returns its duration and stream codecs.
+
+    Returns:
+        dict: ``duration`` in seconds, ``audio``/``video`` codec names
+        (None if the stream is missing) and the video ``size``
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_format", "-show_streams",
+         "-of", "json", str(path)],
+        capture_output=True, text=True, check=True,
+    )
+    data = json.loads(result.stdout)
+    info = {"duration": None, "audio": None, "video": None, "size": None}
+    duration = data.get("format", {}).get("duration")
+    if duration is not None:
+        info["duration"] = float(duration)
+    for stream in data.get("streams", []):
+        codec_type = stream.get("codec_type")
+        if codec_type in ("audio", "video") and info[codec_type] is None:
+            if codec_type == "video" and stream.get("disposition", {}).get("attached_pic"):
+                continue
+            info[codec_type] = stream.get("codec_name")
+            if codec_type == "video":
+                info["size"] = [stream.get("width"), stream.get("height")]
+    return info
+
+
+def load_cache(pack_dir):
+    try:
+        with open(Path(pack_dir) / CACHE_NAME, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def validate_pack(pack_dir, jobs=DEFAULT_JOBS, probe=probe_file):
+    """Validates ``pack_dir`` and returns a report.
+
+    Args:
+        pack_dir (Path): Pack directory containing songs.json
+        jobs (int): Concurrent ffprobe processes
+        probe (callable): Function returning the probe info of a path
+
+    Returns:
+        dict: ``errors`` and ``warnings`` (lists of messages), ``assets``
+        (probe info by relative path) and ``probed``/``cached`` counts
+    """
+    pack_dir = Path(pack_dir)
+    report = {"errors": [], "warnings": [], "assets": {}, "probed": 0, "cached": 0}
+    try:
+        with open(pack_dir / "songs.json", "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        report["errors"].append(f"File not found {pack_dir / 'songs.json'}")
+        return report
+    except json.JSONDecodeError as e:
+        report["errors"].append(f"Invalid JSON in {pack_dir / 'songs.json'}: {e}")
+        return report
+    report["errors"].extend(validate_schema(data))
+    if report["errors"]:
+        return report
+
+    pack = SongPack.from_dict(pack_dir, data)
+    assets = {}
+    for song in pack.songs():
+        assets.setdefault(song.file, "file")
+        if song.video:
+            assets.setdefault(song.video, "video")
+
+    cache = load_cache(pack_dir)
+    entries = {}
+    to_probe = {}
+    for relative in assets:
+        path = pack.path(relative)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            report["errors"].append(f"File not found {path}")
+            continue
+        entry = cache.get(relative, {})
+        entries[relative] = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if (
+            entry.get("size") == stat.st_size
+            and entry.get("mtime") == stat.st_mtime_ns
+            and "info" in entry
+        ):
+            entries[relative]["info"] = entry["info"]
+            report["cached"] += 1
+        else:
+            to_probe[relative] = path
+
+    with ThreadPoolExecutor(max_workers=jobs or DEFAULT_JOBS) as executor:
+        futures = {
+            relative: executor.submit(probe, path) for relative, path in to_probe.items()
+        }
+    for relative, future in futures.items():
+        try:
+            entries[relative]["info"] = future.result()
+            report["probed"] += 1
+        except (OSError, subprocess.CalledProcessError, ValueError) as e:
+            report["errors"].append(f"Could not probe {relative}: {e}")
+            del entries[relative]
+
+    for relative, entry in entries.items():
+        info = entry["info"]
+        stream = ASSET_STREAMS[assets[relative]]
+        if info.get(stream) is None:
+            report["errors"].append(f"No {stream} stream in {relative}")
+        report["assets"][relative] = info
+
+    for song in pack.songs():
+        duration = report["assets"].get(song.file, {}).get("duration")
+        if duration is not None and song.start >= duration:
+            report["warnings"].append(
+                f"{song.title}: start {song.start:g}s is past the end of {song.file} ({duration:.1f}s)"
+            )
+
+    with open(pack_dir / CACHE_NAME, "w", encoding="utf-8") as file:
+        json.dump(entries, file, indent=4)
+    return report
+
+
+def print_report(report):
+    for error in report["errors"]:
+        print(f"Error: {error}")
+    for warning in report["warnings"]:
+        print(f"Warning: {warning}")
+    print(
+        f"{len(report['assets'])} assets checked ({report['probed']} probed, "
+        f"{report['cached']} cached), {len(report['errors'])} errors, "
+        f"{len(report['warnings'])} warnings"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a song pack")
+    parser.add_argument("pack", help="Song package directory inside data/")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS)
+    args = parser.parse_args()
+
+    report = validate_pack(Path("data") / args.pack, args.jobs)
+    print_report(report)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
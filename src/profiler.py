@@ -0,0 +1,100 @@
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+# Shared no-op context returned while profiling is off, so a disabled
+# section costs one attribute check and no allocation
+NULL_SECTION = contextlib.nullcontext()
+
+
+class _Section:
+    __slots__ = ("name", "profiler", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Profiler:
+    """Times named sections of the game loop.
+
+    ``with profiler.section("draw"):`` keeps the last ``window`` durations
+    of each section for percentiles, and with ``trace`` set also records a
+    Chrome trace event (open the file from ``dump`` in chrome://tracing or
+    Perfetto). Nothing is measured while ``enabled`` is False.
+
+    Args:
+        enabled (bool): Start measuring right away
+        trace (bool): Keep trace events for ``dump``; implies ``enabled``
+        window (int): Durations kept per section for the percentiles
+        trace_limit (int): Most recent trace events kept
+    """
+
+    def __init__(self, enabled=False, trace=False, window=600, trace_limit=500000):
+        self.enabled = enabled or trace
+        self.trace = trace
+        self.window = window
+        self.durations = {}
+        self.events = collections.deque(maxlen=trace_limit)
+        self._sections = {}
+        self._origin = time.perf_counter()
+
+    def section(self, name):
+        if not self.enabled:
+            return NULL_SECTION
+        section = self._sections.get(name)
+        if section is None:
+            section = self._sections[name] = _Section(self, name)
+        return section
+
+    def add(self, name, start, end):
+        durations = self.durations.get(name)
+        if durations is None:
+            durations = self.durations[name] = collections.deque(maxlen=self.window)
+        durations.append(end - start)
+        if self.trace:
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    def summary(self):
+        """Returns ``{section: (p50, p95, max)}`` in milliseconds over the window."""
+        result = {}
+        for name, durations in self.durations.items():
+            values = sorted(durations)
+            if values:
+                result[name] = tuple(
+                    values[min(len(values) - 1, int(q * len(values)))] * 1000
+                    for q in (0.5, 0.95)
+                ) + (values[-1] * 1000,)
+        return result
+
+    def lines(self):
+        """Returns one line of text per section for the on-screen overlay."""
+        return [
+            f"{name}: {p50:.2f} / {p95:.2f} / {peak:.2f} ms"
+            for name, (p50, p95, peak) in sorted(self.summary().items())
+        ]
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, file)
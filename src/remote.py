@@ -0,0 +1,291 @@
+"""Remote control and live scoreboard over HTTP.
+
+An asyncio server on its own thread, so the render loop never waits on
+the network:
+
+- ``POST /command`` with a JSON body such as ``{"command": "next_song"}``
+  queues a command; the game loop takes them with ``poll``.
+- ``GET /state`` returns the current game state as JSON.
+- ``GET /events`` is a Server-Sent Events stream: the full state first,
+  then only the keys that changed. Changes published by the game are
+  coalesced to at most one broadcast per ``broadcast_interval`` and
+  encoded once for every client, so the number of viewers does not add
+  work to the game loop.
+- ``GET /`` serves ``remote.html``, a scoreboard page for the audience
+  that shows the host controls when opened as ``/#control``.
+
+When a token is set, commands need an ``Authorization: Bearer <token>``
+header; the scoreboard endpoints stay open. Commands are refused with
+``409`` while ``accepting_commands`` is False (e.g. in the main menu).
+Every response allows any origin (CORS), so other pages can use the
+API too: the token, not the origin, protects the commands.
+"""
+
+import asyncio
+import hmac
+import ipaddress
+import json
+import queue
+import threading
+from pathlib import Path
+
+COMMANDS = (
+    "add_points",
+    "next_song",
+    "previous_song",
+    "next_category",
+    "previous_category",
+    "toggle_pause",
+    "play_video",
+    "undo",
+    "redo",
+)
+STATUS_TEXT = {
+    200: "OK",
+    202: "Accepted",
+    204: "No Content",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    409: "Conflict",
+}
+MAX_BODY = 64 * 1024
+# Viewers that stop reading are dropped once this much is waiting for them
+MAX_CLIENT_BUFFER = 256 * 1024
+PAGE_PATH = Path(__file__).with_name("remote.html")
+CORS_HEADERS = (
+    "Access-Control-Allow-Origin: *\r\n"
+    "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+    "Access-Control-Allow-Headers: Authorization, Content-Type\r\n"
+    "Access-Control-Max-Age: 86400\r\n"
+)
+
+
+def parse_address(value):
+    """Parses ``[HOST:]PORT`` into ``(host, port)``, loopback by default.
+
+    Raises:
+        ValueError: If the port is not a number from 0 to 65535
+    """
+    host, _, port = value.rpartition(":")
+    if not port.isdigit() or int(port) > 65535:
+        raise ValueError(f"{value!r} is not [HOST:]PORT")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class RemoteServer:
+    """HTTP + SSE server for remote commands and scoreboards.
+
+    Args:
+        host (str): Address to listen on, loopback by default
+        port (int): Port to listen on, 0 picks a free one
+        token (str): Shared secret required to send commands
+        on_command (callable): Called from the server thread after a
+            command is queued, e.g. to wake up the game loop
+        broadcast_interval (float): Minimum seconds between broadcasts
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, token=None, on_command=None, broadcast_interval=0.1):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.on_command = on_command
+        self.broadcast_interval = broadcast_interval
+        self.commands = queue.SimpleQueue()
+        self.accepting_commands = True
+        self.broadcasts = 0
+        self._state = {}
+        self._published = None
+        self._clients = set()
+        self._page_bytes = None
+        self._loop = None
+        self._server = None
+        self._changed = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts serving on a background thread.
+
+        Returns:
+            bool: Whether the server is listening
+        """
+        self._thread = threading.Thread(target=self._run, name="remote-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self._server is not None
+
+    def stop(self):
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def poll(self):
+        """Returns (and removes) every queued command; call from the game loop."""
+        commands = []
+        while True:
+            try:
+                commands.append(self.commands.get_nowait())
+            except queue.Empty:
+                return commands
+
+    def publish(self, state):
+        """Makes ``state`` (a JSON-serializable dict) the current game state.
+
+        Cheap to call every frame: nothing is sent unless it changed.
+        """
+        if state == self._published:
+            return
+        self._published = state
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._set_state, state)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._changed = asyncio.Event()
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            print(f"Error: Remote control could not listen on {self.host}:{self.port}. Details: {e}")
+            self._ready.set()
+            return
+        broadcaster = self._loop.create_task(self._broadcast())
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            broadcaster.cancel()
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+
+    def _set_state(self, state):
+        self._state = state
+        self._changed.set()
+
+    async def _broadcast(self):
+        sent = {}
+        while True:
+            await self._changed.wait()
+            # Let the state settle so a burst of changes is sent once
+            await asyncio.sleep(self.broadcast_interval)
+            self._changed.clear()
+            delta = {key: value for key, value in self._state.items() if sent.get(key) != value}
+            if not delta:
+                continue
+            sent = self._state
+            self.broadcasts += 1
+            message = _sse("delta", delta)
+            for writer in list(self._clients):
+                if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                    self._clients.discard(writer)
+                    writer.close()
+                else:
+                    writer.write(message)
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY:
+                raise ValueError("Body too large")
+            body = await reader.readexactly(length) if length else b""
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+
+        path = path.split("?", 1)[0]
+        if method == "GET" and path == "/events":
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n"
+                + CORS_HEADERS.encode("latin-1")
+                + b"\r\n"
+            )
+            writer.write(_sse("state", self._state))
+            self._clients.add(writer)
+            try:
+                # Nothing is expected from the client; this returns when it disconnects
+                await reader.read()
+            except ConnectionError:
+                pass
+            self._clients.discard(writer)
+            writer.close()
+            return
+
+        content_type = "application/json"
+        if method == "OPTIONS":
+            # CORS preflight of a cross-origin command
+            status, payload = 204, b""
+        elif method == "GET" and path in ("/", "/index.html"):
+            status, payload = 200, self._page()
+            content_type = "text/html; charset=utf-8"
+        else:
+            if method == "GET" and path == "/state":
+                status, response = 200, self._state
+            elif method == "POST" and path == "/command":
+                status, response = self._queue_command(headers, body)
+            else:
+                status, response = 404, {"error": "not found"}
+            payload = json.dumps(response).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n{CORS_HEADERS}\r\n".encode("latin-1")
+            + payload
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    def _page(self):
+        if self._page_bytes is None:
+            self._page_bytes = PAGE_PATH.read_bytes()
+        return self._page_bytes
+
+    def _queue_command(self, headers, body):
+        if self.token is not None:
+            expected = f"Bearer {self.token}"
+            if not hmac.compare_digest(headers.get("authorization", ""), expected):
+                return 401, {"error": "missing or wrong token"}
+        try:
+            command = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            return 400, {"error": "body must be JSON"}
+        if not isinstance(command, dict) or command.get("command") not in COMMANDS:
+            return 400, {"error": f"command must be one of {', '.join(COMMANDS)}"}
+        if not self.accepting_commands:
+            return 409, {"error": "no show is running"}
+        self.commands.put(command)
+        if self.on_command is not None:
+            self.on_command()
+        return 202, {"queued": command["command"]}
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
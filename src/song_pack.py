@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+
+TIMING_KEYS = ("start", "duration", "fade")
+
+
+class Song:
+    """One entry of a category in ``songs.json``."""
+
+    __slots__ = (
+        "category",
+        "duration",
+        "fade",
+        "file",
+        "index",
+        "start",
+        "title",
+        "video",
+    )
+
+    def __init__(self, data, category, index):
+        video = data.get("video")
+        self.title = data.get("title", "")
+        self.file = data.get("file")
+        self.video = video if video and video != "false" else None
+        self.start = float(data.get("start") or 0)
+        self.duration = float(data["duration"]) if data.get("duration") else None
+        self.fade = float(data.get("fade") or 0)
+        self.category = category
+        self.index = index
+
+    def __repr__(self):
+        return f"Song({self.title!r}, {self.file!r})"
+
+
+class Category:
+    """A category whose ``Song`` records are only built when first needed."""
+
+    __slots__ = ("_raw_songs", "_songs", "description", "index", "name")
+
+    def __init__(self, data, index):
+        self.name = data.get("name", "")
+        self.description = data.get("description", "")
+        self.index = index
+        self._raw_songs = [self._check_timing(song) for song in data.get("songs", [])]
+        self._songs = None
+
+    def _check_timing(self, song):
+        """Reports timing values that are not numbers and drops them.
+
+        Checked when the pack is loaded, so a typo shows up at startup
+        instead of when the category is first opened during a show.
+        """
+        invalid = []
+        for key in TIMING_KEYS:
+            value = song.get(key)
+            if value in (None, ""):
+                continue
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                invalid.append(key)
+                print(
+                    f"Error: Invalid {key} {value!r} for song {song.get('title', '')!r} "
+                    f"in category {self.name!r}, ignoring it"
+                )
+        if not invalid:
+            return song
+        return {key: value for key, value in song.items() if key not in invalid}
+
+    @property
+    def songs(self):
+        if self._songs is None:
+            self._songs = [
+                Song(song, self, index) for index, song in enumerate(self._raw_songs)
+            ]
+            self._raw_songs = None
+        return self._songs
+
+    def __len__(self):
+        return len(self._songs if self._songs is not None else self._raw_songs)
+
+    def __getitem__(self, index):
+        return self.songs[index]
+
+
+class SongPack:
+    """Catalog of a song pack directory (``data/<pack>/songs.json``).
+
+    Songs are addressed by category and position, or looked up by title.
+    """
+
+    def __init__(self, directory, categories):
+        self.directory = Path(directory)
+        self.categories = categories
+        self._titles = None
+
+    @classmethod
+    def load(cls, directory):
+        """Loads ``directory/songs.json``; a missing or broken file gives an empty pack."""
+        songs_file = Path(directory) / "songs.json"
+        try:
+            with open(songs_file, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            print(f"Error: File not found {songs_file}")
+            data = {"categories": []}
+        except json.JSONDecodeError:
+            print(f"Error: The file {songs_file} has an invalid JSON format")
+            data = {"categories": []}
+        return cls.from_dict(directory, data)
+
+    @classmethod
+    def from_dict(cls, directory, data):
+        return cls(
+            directory,
+            [Category(category, index) for index, category in enumerate(data["categories"])],
+        )
+
+    def __len__(self):
+        return len(self.categories)
+
+    def song(self, category_index, song_index):
+        """Returns the song at a position, or None if there is none."""
+        if 0 <= category_index < len(self.categories):
+            category = self.categories[category_index]
+            if 0 <= song_index < len(category):
+                return category[song_index]
+        return None
+
+    def songs(self):
+        """Yields every song of every category in order."""
+        for category in self.categories:
+            yield from category.songs
+
+    def find(self, title):
+        """Returns the first song with ``title``, or None."""
+        if self._titles is None:
+            self._titles = {}
+            for song in self.songs():
+                self._titles.setdefault(song.title, song)
+        return self._titles.get(title)
+
+    def path(self, relative):
+        return self.directory / relative
@@ -0,0 +1,40 @@
+import collections
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces.
+
+    Rasterizing text is one of the most expensive things a frame does on a
+    Raspberry Pi, while the HUD text rarely changes, so each
+    ``(text, font, color)`` combination is rendered once and reused.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = collections.OrderedDict()
+
+    def render(self, font, text, color=(255, 255, 255)):
+        """Returns an antialiased surface of ``text``, rendering it only once."""
+        key = (text, font, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._surfaces)}
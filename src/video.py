@@ -0,0 +1,261 @@
+import collections
+import queue
+import sys
+import threading
+import time
+
+import pygame
+from ffpyplayer.player import MediaPlayer
+
+# Ask ffmpeg for pixels already laid out like a 32-bit pygame surface with
+# these masks, so frames can be copied straight into the surface memory.
+FRAME_MASKS = (0xFF0000, 0x00FF00, 0x0000FF, 0)
+FRAME_FORMAT = "bgr0" if sys.byteorder == "little" else "0rgb"
+SCALING_POLICIES = ("fit", "fill", "native")
+
+
+def compute_target_size(source_size, screen_size, policy="fit"):
+    """Returns the size a video should be decoded at for a scaling policy.
+
+    Args:
+        source_size (tuple): Width and height of the video stream
+        screen_size (tuple): Width and height of the screen
+        policy (str): "fit" keeps the aspect ratio and letterboxes, "fill"
+            stretches to the whole screen and "native" never upscales (it
+            behaves like "fit" for videos larger than the screen)
+
+    Returns:
+        tuple: Target width and height
+    """
+    source_width, source_height = source_size
+    screen_width, screen_height = screen_size
+    if policy == "fill":
+        return screen_width, screen_height
+    scale = min(screen_width / source_width, screen_height / source_height)
+    if policy == "native":
+        scale = min(scale, 1.0)
+    return (
+        max(1, round(source_width * scale)),
+        max(1, round(source_height * scale)),
+    )
+
+
+def choose_sws_flags(source_size, target_size):
+    """Returns the cheapest ffmpeg scaler that looks right for the ratio.
+
+    Args:
+        source_size (tuple): Source width and height, or None if unknown
+        target_size (tuple): Target width and height, or None if unknown
+
+    Returns:
+        str: Value for the ``sws_flags`` option
+    """
+    if source_size is None or target_size is None:
+        return "fast_bilinear"
+    ratio = min(target_size[0] / source_size[0], target_size[1] / source_size[1])
+    if ratio == 1:
+        return "point"
+    if ratio < 0.5:
+        # Strong downscaling aliases badly with bilinear sampling
+        return "area"
+    return "fast_bilinear"
+
+
+class FrameUploader:
+    """Copies decoded ``FRAME_FORMAT`` pictures into surfaces allocated once.
+
+    The picture is copied row by row into ``frame_surface`` through its
+    byte view, then blitted (or scaled, for pictures decoded before the
+    target size took effect) into ``surface`` of the target ``size``.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.surface = pygame.Surface(size, 0, 32, FRAME_MASKS)
+        self.frame_surface = None
+        self.upload_times = collections.deque(maxlen=240)
+
+    def upload(self, image):
+        """Copies an ffpyplayer ``Image`` into ``surface`` and returns it."""
+        start = time.perf_counter()
+        width, height = size = image.get_size()
+        if self.frame_surface is None or self.frame_surface.get_size() != size:
+            self.frame_surface = pygame.Surface(size, 0, 32, FRAME_MASKS)
+        target = memoryview(self.frame_surface.get_view("0")).cast("B")
+        # ffpyplayer's own buffer type has no slicing: view it through memoryview, without copying
+        pixels = memoryview(image.to_memoryview(keep_align=True)[0]).cast("B")
+        linesize = image.get_linesizes(keep_align=True)[0]
+        pitch = self.frame_surface.get_pitch()
+        if linesize == pitch:
+            target[:] = pixels[: len(target)]
+        else:
+            # Decoder rows are padded for alignment: copy only the pixels
+            row = width * 4
+            for y in range(height):
+                target[y * pitch : y * pitch + row] = pixels[y * linesize : y * linesize + row]
+        # Unlocks the surface so it can be blitted
+        target.release()
+        if size == self.size:
+            self.surface.blit(self.frame_surface, (0, 0))
+        else:
+            pygame.transform.scale(self.frame_surface, self.size, self.surface)
+        self.upload_times.append(time.perf_counter() - start)
+        return self.surface
+
+
+class VideoPlayer:
+    """Plays a video with a single ffmpeg decoder for both audio and pictures.
+
+    ``MediaPlayer`` plays the audio, keeps the video in sync with the audio
+    clock, and converts and scales pictures to ``FRAME_FORMAT`` at the size
+    chosen by the scaling policy. A worker thread keeps the decoded pictures
+    in a bounded queue with their presentation time; the render loop picks
+    the frame that is due and copies it into a surface allocated once per
+    video, so steady-state playback allocates no surfaces or arrays.
+    """
+
+    def __init__(self, path, screen_size, queue_size=8, scaling="fit", source_size=None):
+        self.screen_size = screen_size
+        self.scaling = scaling
+        # Without a known source size the target is computed from the first frame
+        self.size = (
+            compute_target_size(source_size, screen_size, scaling)
+            if source_size
+            else None
+        )
+        self.player = MediaPlayer(
+            str(path),
+            ff_opts={"out_fmt": FRAME_FORMAT},
+            lib_opts={"sws_flags": choose_sws_flags(source_size, self.size)},
+        )
+        if self.size is not None:
+            self.player.set_size(*self.size)
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.frames_decoded = 0
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.decode_times = collections.deque(maxlen=240)
+        self.is_paused = False
+        self.uploader = None
+        self._pending = None
+        self._finished = False
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="video-decoder", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            start = time.perf_counter()
+            frame, val = self.player.get_frame()
+            if val == "eof":
+                break
+            if frame is None:
+                # val is the time until the next picture is due, or "paused"
+                time.sleep(val if isinstance(val, float) and val > 0 else 0.005)
+                continue
+            self.decode_times.append(time.perf_counter() - start)
+            image, pts = frame
+            if self.size is None:
+                self.size = compute_target_size(
+                    image.get_size(), self.screen_size, self.scaling
+                )
+                # Let ffmpeg's scaler produce the target size from now on
+                self.player.set_size(*self.size)
+            self.frames_decoded += 1
+            while self._running:
+                try:
+                    self.frames.put((pts, image), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+        self._finished = True
+
+    def get_clock(self):
+        """Returns the playback position in seconds (the audio clock)."""
+        return self.player.get_pts()
+
+    def get_frame(self):
+        """Returns the video surface if a new frame became due, otherwise None.
+
+        Frames that were already late when a newer one became due are
+        skipped without being uploaded and counted in ``frames_dropped``.
+        """
+        clock = self.get_clock()
+        image = None
+        while True:
+            if self._pending is None:
+                try:
+                    self._pending = self.frames.get_nowait()
+                except queue.Empty:
+                    break
+            pts, pending_image = self._pending
+            if pts > clock:
+                break
+            if image is not None:
+                self.frames_dropped += 1
+            image = pending_image
+            self._pending = None
+        if image is None:
+            return None
+        if self.uploader is None:
+            self.uploader = FrameUploader(self.size)
+        self.frames_shown += 1
+        return self.uploader.upload(image)
+
+    def next_frame_delay(self):
+        """Returns the seconds until the next queued frame is due, or None if none is queued."""
+        if self._pending is None:
+            try:
+                self._pending = self.frames.get_nowait()
+            except queue.Empty:
+                return None
+        return max(0.0, self._pending[0] - self.get_clock())
+
+    def pause(self):
+        self.player.set_pause(True)
+        self.is_paused = True
+
+    def resume(self):
+        self.player.set_pause(False)
+        self.is_paused = False
+
+    def toggle_pause(self):
+        if self.is_paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def is_finished(self):
+        return self._finished and self._pending is None and self.frames.empty()
+
+    def stats(self):
+        decode_times = list(self.decode_times)
+        upload_times = list(self.uploader.upload_times) if self.uploader else []
+        return {
+            "decoded": self.frames_decoded,
+            "shown": self.frames_shown,
+            "dropped": self.frames_dropped,
+            "queued": self.frames.qsize(),
+            "queue_size": self.frames.maxsize,
+            "decode_ms_avg": (
+                1000 * sum(decode_times) / len(decode_times) if decode_times else 0.0
+            ),
+            "decode_ms_max": 1000 * max(decode_times) if decode_times else 0.0,
+            "upload_ms_avg": (
+                1000 * sum(upload_times) / len(upload_times) if upload_times else 0.0
+            ),
+            "upload_ms_max": 1000 * max(upload_times) if upload_times else 0.0,
+        }
+
+    def close(self):
+        self._running = False
+        # Unblock a worker waiting on a full queue
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join(timeout=1.0)
+        self.player.close_player()
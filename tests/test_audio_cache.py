@@ -0,0 +1,77 @@
+import io
+import time
+
+from audio_cache import AudioPreloader, CachedAudioFile
+
+
+def wait_until(predicate, timeout=1.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.001)
+    return predicate()
+
+def test_cached_file_reads_past_the_preloaded_head(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(bytes(range(100)))
+    file = CachedAudioFile(path, bytes(range(10)))
+    assert file.read(4) == bytes([0, 1, 2, 3])
+    assert file.read(20) == bytes(range(4, 10))
+    assert file.read(5) == bytes(range(10, 15))
+    file.seek(-3, io.SEEK_END)
+    assert file.read() == bytes([97, 98, 99])
+    file.seek(2)
+    assert file.read(3) == bytes([2, 3, 4])
+    file.close()
+
+def test_prefetch_turns_open_into_a_hit(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"x" * 50)
+    cache = AudioPreloader(head_bytes=16)
+    cache.prefetch([path])
+    assert wait_until(lambda: cache.is_cached(path))
+    file = cache.open(path)
+    assert file.read() == b"x" * 50
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.close()
+
+def test_miss_streams_from_disk_and_caches_in_the_background(tmp_path):
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"x" * 50)
+    cache = AudioPreloader(head_bytes=16)
+    file = cache.open(path)
+    assert file.read() == b"x" * 50
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert wait_until(lambda: cache.is_cached(path))
+    cache.close()
+
+def test_prefetch_keeps_a_missed_song_queued(tmp_path):
+    missed, neighbour = tmp_path / "missed.mp3", tmp_path / "next.mp3"
+    missed.write_bytes(b"x" * 10)
+    neighbour.write_bytes(b"y" * 10)
+    cache = AudioPreloader()
+    # Holding the lock keeps the worker from taking the miss before prefetch runs
+    with cache._condition:
+        cache.open(missed)
+        cache.prefetch([neighbour])
+        assert cache._pending == [str(missed), str(neighbour)]
+    assert wait_until(lambda: cache.is_cached(missed) and cache.is_cached(neighbour))
+    cache.close()
+
+def test_least_recently_used_song_is_evicted(tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.mp3"
+        path.write_bytes(b"x" * 10)
+        paths.append(path)
+    cache = AudioPreloader(max_bytes=20)
+    cache.open(paths[0])
+    assert wait_until(lambda: cache.is_cached(paths[0]))
+    cache.open(paths[1])
+    assert wait_until(lambda: cache.is_cached(paths[1]))
+    cache.open(paths[0])
+    cache.open(paths[2])
+    assert wait_until(lambda: cache.is_cached(paths[2]))
+    assert cache.is_cached(paths[0])
+    assert not cache.is_cached(paths[1])
+    assert cache.cached_bytes == 20
+    cache.close()
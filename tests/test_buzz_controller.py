@@ -12,7 +12,7 @@ class FakeHIDException(Exception):
 hid_mock.HIDException = FakeHIDException
 sys.modules["hid"] = hid_mock
 
-from buzz_controller import BuzzController
+from buzz_controller import ButtonState, BuzzController
 
 
 @pytest.fixture
@@ -112,3 +112,172 @@ def test_get_info_prints(monkeypatch, mock_hid_device, capsys):
     out = capsys.readouterr().out
     assert "Sony" in out
     assert "Buzz" in out
+
+def test_reader_queues_timestamped_edge_events(mock_hid_device):
+    controller = BuzzController()
+    reports = [
+        [0, 0, 0x01, 0x00, 0x00],  # Player 0 red pressed
+        [0, 0, 0x21, 0x00, 0x00],  # Player 1 red pressed too
+        [0, 0, 0x20, 0x00, 0x00],  # Player 0 red released
+    ]
+    mock_hid_device.read.side_effect = lambda n, timeout=None: reports.pop(0) if reports else []
+    controller.start_reader()
+    deadline = time.time() + 1.0
+    events = []
+    while len(events) < 3 and time.time() < deadline:
+        events.extend(controller.get_events())
+    controller.stop_reader()
+    mock_hid_device.read.side_effect = None
+
+    assert [(e.controller, e.button, e.pressed) for e in events] == [
+        (0, "red", True),
+        (1, "red", True),
+        (0, "red", False),
+    ]
+    timestamps = [e.timestamp for e in events]
+    assert timestamps == sorted(timestamps)
+
+def test_get_button_status_uses_reader_state(mock_hid_device):
+    controller = BuzzController()
+    mock_hid_device.read.return_value = []
+    controller.start_reader()
+    mock_hid_device.read.reset_mock()
+    controller.get_button_status()
+    controller.stop_reader()
+    assert all(call.args == (5, controller.read_timeout_ms) for call in mock_hid_device.read.call_args_list)
+
+def test_discard_events_before_drops_stale_events(mock_hid_device):
+    controller = BuzzController()
+    controller._process_report([0, 0, 0x01, 0x00, 0x00], 1.0)
+    controller._process_report([0, 0, 0x00, 0x00, 0x00], 2.0)
+    controller._process_report([0, 0, 0x20, 0x00, 0x00], 3.0)
+    controller.discard_events_before(2.5)
+    events = controller.get_events()
+    assert [(e.controller, e.pressed, e.timestamp) for e in events] == [(1, True, 3.0)]
+
+def test_events_of_one_report_share_a_sequence(mock_hid_device):
+    controller = BuzzController()
+    controller._process_report([0, 0, 0x21, 0x00, 0x00], 1.0)  # Players 0 and 1 red
+    controller._process_report([0, 0, 0x20, 0x00, 0x00], 2.0)
+    events = controller.get_events()
+    assert [(e.controller, e.pressed, e.sequence) for e in events] == [
+        (0, True, 1),
+        (1, True, 1),
+        (0, False, 2),
+    ]
+
+def test_on_press_is_called_only_for_presses(mock_hid_device):
+    controller = BuzzController()
+    calls = []
+    controller.on_press = lambda: calls.append(True)
+    controller._process_report([0, 0, 0x01, 0x00, 0x00], 1.0)
+    controller._process_report([0, 0, 0x01, 0x00, 0x00], 2.0)
+    controller._process_report([0, 0, 0x00, 0x00, 0x00], 3.0)
+    assert calls == [True]
+
+def test_light_set_mask_writes_one_report(mock_hid_device):
+    controller = BuzzController()
+    mock_hid_device.write.reset_mock()
+    controller.light_set_mask(0b1011)
+    mock_hid_device.write.assert_called_once_with(bytes([0, 0, 0xFF, 0xFF, 0, 0xFF, 0, 0]))
+
+def test_flush_lights_skips_unchanged_and_rate_limits(mock_hid_device):
+    controller = BuzzController()
+    controller.light_write_interval = 1.0
+    mock_hid_device.write.reset_mock()
+    controller.light_set_mask(0b0001)
+    controller.light_set_mask(0b0001)
+    assert mock_hid_device.write.call_count == 1
+
+    # A change inside the rate limit window is held back until the next flush
+    controller.light_set_mask(0b0010)
+    assert mock_hid_device.write.call_count == 1
+    controller.flush_lights(force=True)
+    mock_hid_device.write.assert_called_with(bytes([0, 0, 0, 0xFF, 0, 0, 0, 0]))
+    controller.lights.shutdown()
+
+def test_held_back_lights_are_written_without_a_reader(mock_hid_device):
+    controller = BuzzController()
+    controller.light_blink([1])
+    controller.light_blink_stop()
+    # Let the light thread go idle, then change the lights twice within the rate limit
+    time.sleep(0.1)
+    controller.light_set(2, True)
+    controller.light_set(3, True)
+    deadline = time.time() + 1.0
+    while controller.lights_pending() and time.time() < deadline:
+        time.sleep(0.005)
+    controller.lights.shutdown()
+    assert not controller.lights_pending()
+    mock_hid_device.write.assert_called_with(bytes([0, 0, 0, 0, 0xFF, 0xFF, 0, 0]))
+
+def test_light_animator_flash_ends_lit(mock_hid_device):
+    controller = BuzzController()
+    controller.light_write_interval = 0
+    writes = []
+    mock_hid_device.write.side_effect = lambda data: writes.append(bytes(data))
+    controller.lights.flash([2], times=2, interval=0.001)
+    deadline = time.time() + 1.0
+    while controller.lights._frames is not None and time.time() < deadline:
+        time.sleep(0.001)
+    controller.lights.shutdown()
+    mock_hid_device.write.side_effect = None
+
+    lit = bytes([0, 0, 0, 0, 0xFF, 0, 0, 0])
+    assert writes[0] == lit
+    assert writes[-1] == lit
+    assert bytes(8) in writes
+
+def test_light_animator_set_stops_pattern(mock_hid_device):
+    controller = BuzzController()
+    controller.lights.blink([0, 1], interval=10)
+    controller.lights.set(0b0100)
+    controller.lights.shutdown()
+    assert controller.lights._frames is None
+    assert controller.light_array == bytes([0, 0, 0, 0, 0xFF, 0, 0, 0])
+
+def test_button_state_from_report_matches_dict_view():
+    state = ButtonState.from_report([0, 0, 0x21, 0x02, 0x08])
+    assert state.is_pressed(0, "red")
+    assert state.is_pressed(1, "red")
+    assert state.is_pressed(1, "blue")
+    assert state.is_pressed(3, "blue")
+    assert list(state) == [(0, "red"), (1, "red"), (1, "blue"), (3, "blue")]
+    dicts = state.as_dicts()
+    assert dicts[1] == {"red": True, "yellow": False, "green": False, "orange": False, "blue": True}
+    assert not any(dicts[2].values())
+
+def test_button_state_edges():
+    previous = ButtonState.from_report([0, 0, 0x01, 0x00, 0x00])
+    current = ButtonState.from_report([0, 0, 0x20, 0x00, 0x00])
+    assert list(current.pressed_since(previous)) == [(1, "red")]
+    assert list(current.released_since(previous)) == [(0, "red")]
+    assert not current.pressed_since(current)
+
+def test_multiple_devices_share_one_controller_numbering():
+    first, second = MagicMock(), MagicMock()
+    controller = BuzzController(devices=[first, second])
+    assert controller.controller_count == 8
+
+    controller._process_report([0, 0, 0x00, 0x04, 0x00], 2.0, device=1)  # Player 6 red
+    controller._process_report([0, 0, 0x01, 0x00, 0x00], 1.0, device=0)  # Player 0 red
+    events = controller.get_events()
+    assert [(e.controller, e.button) for e in events] == [(0, "red"), (6, "red")]
+    assert controller.get_button_status()[6]["red"] is True
+
+    controller.light_set_mask(1 << 5)
+    first.write.assert_called_with(bytes(8))
+    second.write.assert_called_with(bytes([0, 0, 0, 0xFF, 0, 0, 0, 0]))
+
+def test_failed_light_write_keeps_the_reader_running(capsys):
+    device = MagicMock()
+    device.read.return_value = b""
+    controller = BuzzController(devices=[device])
+    device.write.side_effect = OSError("unplugged")
+    controller.start_reader()
+    controller.light_set_mask(0b0001)
+    time.sleep(0.05)
+    assert all(thread.is_alive() for thread in controller._reader_threads)
+    controller.stop_reader()
+    controller.lights.shutdown()
+    assert "light write failed" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+import json
+import random
+
+import pytest
+
+from buzz_controller import BuzzEvent
+from buzz_stats import BuzzArbiter, BuzzStats
+
+
+def press(controller, timestamp, sequence):
+    return BuzzEvent(controller, "red", True, timestamp, sequence)
+
+def test_first_report_wins_without_tie():
+    arbiter = BuzzArbiter("random")
+    winner, tied = arbiter.decide([press(0, 2.0, 2), press(3, 1.0, 1)])
+    assert (winner.controller, tied) == (3, [])
+
+def test_random_tie_break_is_not_index_order():
+    arbiter = BuzzArbiter("random", rng=random.Random(1))
+    winners = {arbiter.decide([press(0, 1.0, 1), press(2, 1.0, 1)])[0].controller for _ in range(50)}
+    assert winners == {0, 2}
+
+def test_earliest_tie_break_uses_the_prior_report():
+    arbiter = BuzzArbiter("earliest")
+    arbiter.observe([BuzzEvent(2, "red", False, 0.5, 1), BuzzEvent(0, "red", False, 0.8, 2)])
+    winner, tied = arbiter.decide([press(0, 1.0, 3), press(2, 1.0, 3), press(1, 1.5, 4)])
+    assert (winner.controller, tied) == (2, [0, 2])
+
+def test_rotating_tie_break():
+    arbiter = BuzzArbiter("rotating")
+    presses = [press(5, 1.0, 1), press(1, 1.0, 1), press(3, 1.0, 1)]
+    assert [arbiter.decide(presses)[0].controller for _ in range(4)] == [1, 3, 5, 1]
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BuzzArbiter("index")
+
+def test_export_histograms(tmp_path):
+    stats = BuzzStats("random")
+    stats.record(press(0, 1.0, 1), [], 1.0003, 1.0015)
+    stats.record(press(1, 2.0, 2), [1, 2], 2.0004, 2.3)
+    stats.export(tmp_path / "buzz_stats.json")
+
+    data = json.loads((tmp_path / "buzz_stats.json").read_text())
+    assert data["ties"] == 1
+    assert data["buzzes"][1]["tied"] == [1, 2]
+    assert {bound: count for bound, count in data["histograms"]["decision_ms"]}[0.5] == 2
+    pause = {bound: count for bound, count in data["histograms"]["pause_ms"]}
+    assert (pause[2], pause[None]) == (1, 1)
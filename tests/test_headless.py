@@ -0,0 +1,71 @@
+import sys
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("i18n")
+pytest.importorskip("pygame_menu")
+pytest.importorskip("ffpyplayer")
+pytest.importorskip("numpy")
+
+from headless import FakeBuzzDevice, HeadlessGame, make_pack
+
+
+@pytest.fixture
+def harness(tmp_path):
+    harness = HeadlessGame(make_pack(tmp_path / "pack", categories=2, songs_per_category=3), dongles=2)
+    yield harness
+    harness.close()
+
+def test_fake_device_reports_presses():
+    device = FakeBuzzDevice()
+    device.press(1, "blue")
+    device.release(1, "blue")
+    assert device.read(5, 10) == bytes([0x7F, 0, 0x00, 0x02, 0])
+    assert device.read(5, 10) == bytes([0x7F, 0, 0, 0, 0])
+    assert device.read(5, 1) == b""
+
+def test_runs_without_hidapi(tmp_path, monkeypatch):
+    # Importing hid now fails, as on a machine without the native library
+    monkeypatch.setitem(sys.modules, "hid", None)
+    harness = HeadlessGame(make_pack(tmp_path / "pack", categories=1, songs_per_category=1))
+    assert harness.game.buzz_controller.controller_count == 4
+    harness.close()
+
+def test_first_buzz_pauses_the_song(harness):
+    game = harness.game
+    game.start_game()
+    assert harness.run_until(lambda: game.is_buzz_round_active)
+
+    harness.press(6)
+    assert harness.run_until(lambda: game.waiting_for_player is not None)
+    assert game.waiting_for_player == 6
+    assert not harness.music.get_busy()
+
+    harness.key(pygame.K_q)
+    harness.step()
+    assert game.players[6]["score"] == game.CORRECT_ANSWER_POINTS
+    assert harness.music.get_busy()
+
+def test_navigation_and_dirty_rects(harness):
+    game = harness.game
+    game.start_game()
+    assert harness.step() is None
+    harness.key(pygame.K_UP)
+    harness.step()
+    assert (game.current_category, game.song.title) == (1, "Song 1.0")
+    assert harness.step() == []
+
+def test_remote_commands_drive_the_game(harness):
+    game = harness.game
+    game.start_game()
+    assert harness.run_until(lambda: game.is_buzz_round_active)
+    harness.press(1)
+    assert harness.run_until(lambda: game.waiting_for_player == 1)
+
+    game.handle_command({"command": "add_points", "player": 1, "points": 5})
+    assert game.players[1]["score"] == 5
+    game.handle_command({"command": "undo"})
+    assert game.players[1]["score"] == 0
+    assert game.remote_state()["players"][1] == {"name": "", "score": None}
+    assert game.remote_state()["playing"]
@@ -0,0 +1,86 @@
+from journal import Journal, ShowState
+
+
+def test_undo_and_redo_scores():
+    state = ShowState(2)
+    state.apply({"type": "score", "player": 0, "points": 5})
+    state.apply({"type": "score", "player": 1, "points": 5})
+    state.apply({"type": "score", "player": 1, "points": -3})
+
+    assert state.apply({"type": "undo"}) == {"player": 1, "points": -3}
+    assert state.apply({"type": "undo"}) == {"player": 1, "points": 5}
+    assert state.scores == [5, 0]
+    state.apply({"type": "redo"})
+    assert state.scores == [5, 5]
+
+    state.apply({"type": "score", "player": 0, "points": 5})
+    assert state.apply({"type": "redo"}) is None
+    assert state.scores == [10, 5]
+
+def test_resume_replays_the_journal(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal.start(path, 2)
+    journal.append("names", names=["Red", "Blue"])
+    journal.append("navigate", category=1, song=3)
+    journal.append("score", player=1, points=5)
+    journal.append("buzz", player=0)
+    journal.append("undo")
+    journal.close()
+
+    state = Journal.replay(path, 2)
+    assert (state.names, state.scores) == (["Red", "Blue"], [0, 0])
+    assert (state.category, state.song, state.seq) == (1, 3, 5)
+    assert state.redo_stack == [{"player": 1, "points": 5}]
+
+    journal = Journal.start(path, 2, resume=True)
+    journal.append("redo")
+    journal.close()
+    assert Journal.replay(path, 2).scores == [0, 5]
+
+def test_replay_starts_from_the_snapshot(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal.start(path, 1, snapshot_interval=3)
+    for _ in range(4):
+        journal.append("score", player=0, points=1)
+    journal.close()
+    assert journal.snapshot_path.exists()
+
+    # Records covered by the snapshot are not folded again
+    lines = path.read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines[:3]).replace(b"score", b"xxxxx") + lines[3])
+    assert Journal.replay(path, 1).scores == [4]
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal.start(path, 1)
+    journal.append("score", player=0, points=5)
+    journal.close()
+    with open(path, "ab") as file:
+        file.write(b'{"seq": 2, "type": "sco')
+    assert Journal.replay(path, 1).scores == [5]
+
+def test_resume_after_a_crash_starts_a_new_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal.start(path, 1)
+    journal.append("score", player=0, points=5)
+    journal.close()
+    with open(path, "ab") as file:
+        file.write(b'{"seq": 2, "type": "sco')
+
+    journal = Journal.start(path, 1, resume=True)
+    journal.append("score", player=0, points=3)
+    journal.close()
+    assert Journal.replay(path, 1).scores == [8]
+
+def test_new_shows_keep_every_previous_journal(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    for points in (5, 3):
+        journal = Journal.start(path, 1)
+        journal.append("score", player=0, points=points)
+        journal.close()
+
+    journal = Journal.start(path, 1)
+    journal.close()
+    assert Journal.replay(path, 1).scores == [0]
+    archives = sorted(tmp_path.glob("journal-*.jsonl"))
+    assert sorted(Journal.replay(archive, 1).scores[0] for archive in archives) == [3, 5]
@@ -0,0 +1,64 @@
+import json
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import loudness
+
+
+def test_integrated_loudness_of_a_steady_signal():
+    # Mean square 0.1 per channel: -0.691 + 10 * log10(0.2)
+    energies = np.full(50, 0.2)
+    assert loudness.integrated_loudness(energies) == pytest.approx(-7.68, abs=0.01)
+
+def test_silence_is_gated_out():
+    energies = np.concatenate([np.full(50, 0.2), np.zeros(50)])
+    # Only the blocks overlapping the fade to silence lower the result
+    assert loudness.integrated_loudness(energies) == pytest.approx(-7.81, abs=0.01)
+    assert loudness.integrated_loudness(np.zeros(50)) == -math.inf
+
+def test_chunk_energies_carry_partial_subblocks():
+    frames = loudness.SUBBLOCK * 3 // 2
+    samples = np.full((frames, 4), 16384, dtype=np.int16)
+    samples[0, 0] = -32768
+    leftover = np.empty((0, 2))
+    energies, peak, leftover = loudness.chunk_energies(samples, leftover)
+    # Mean square 0.25 on each of the two K-weighted channels
+    assert energies == pytest.approx([0.5])
+    assert peak == 32768
+    assert leftover.shape == (loudness.SUBBLOCK // 2, 2)
+    samples = np.full((loudness.SUBBLOCK // 2, 4), 16384, dtype=np.int16)
+    energies, peak, leftover = loudness.chunk_energies(samples, leftover)
+    assert energies == pytest.approx([0.5])
+    assert peak == 16384
+    assert leftover.shape == (0, 2)
+
+def test_gain_never_clips():
+    assert loudness.track_gain(-13.0, -1.0, target=-23.0) == -10.0
+    assert loudness.track_gain(-30.0, -3.0, target=-23.0) == 3.0
+    assert loudness.gain_to_volume(3.0) == 1.0
+    assert loudness.gain_to_volume(-20.0) == pytest.approx(0.1)
+
+def test_analyze_pack_only_measures_new_files(tmp_path):
+    (tmp_path / "a.mp3").write_bytes(b"a")
+    (tmp_path / "b.mp3").write_bytes(b"b")
+    songs = {"categories": [{"name": "C", "songs": [{"file": "a.mp3"}, {"file": "b.mp3"}]}]}
+    (tmp_path / "songs.json").write_text(json.dumps(songs), encoding="utf-8")
+    measured = []
+    def fake_measure(path):
+        measured.append(path.name)
+        return -13.0, -1.0
+
+    stats = loudness.analyze_pack(tmp_path, measure=fake_measure)
+    assert stats == {"analyzed": 2, "cached": 0, "failed": 0}
+    assert loudness.load_gains(tmp_path) == {"a.mp3": -10.0, "b.mp3": -10.0}
+
+    measured.clear()
+    (tmp_path / "c.mp3").write_bytes(b"c")
+    songs["categories"][0]["songs"].append({"file": "c.mp3"})
+    (tmp_path / "songs.json").write_text(json.dumps(songs), encoding="utf-8")
+    stats = loudness.analyze_pack(tmp_path, measure=fake_measure)
+    assert stats == {"analyzed": 1, "cached": 2, "failed": 0}
+    assert measured == ["c.mp3"]
@@ -0,0 +1,72 @@
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pack_compiler
+
+
+def make_pack(pack_dir):
+    (pack_dir / "ost").mkdir(parents=True)
+    (pack_dir / "ost" / "theme.mp3").write_bytes(b"audio")
+    (pack_dir / "ost" / "theme.mp4").write_bytes(b"video")
+    songs = {
+        "categories": [
+            {
+                "name": "OST",
+                "songs": [
+                    {"title": "Theme", "file": "ost/theme.mp3", "video": "ost/theme.mp4"},
+                    {"title": "Missing", "file": "missing.mp3", "video": False},
+                ],
+            }
+        ]
+    }
+    (pack_dir / "songs.json").write_text(json.dumps(songs), encoding="utf-8")
+
+def test_compile_pack_transcodes_then_skips_unchanged(tmp_path, monkeypatch):
+    calls = []
+    def fake_transcode(source, output, kind):
+        calls.append((source.name, kind))
+        output.write_bytes(b"compiled")
+    monkeypatch.setattr(pack_compiler, "transcode", fake_transcode)
+    make_pack(tmp_path / "pack")
+
+    stats = pack_compiler.compile_pack(
+        tmp_path / "pack", tmp_path / "out", executor=ThreadPoolExecutor()
+    )
+    assert stats == {"compiled": 2, "skipped": 0, "failed": 1}
+    assert sorted(calls) == [("theme.mp3", "file"), ("theme.mp4", "video")]
+    songs = json.loads((tmp_path / "out" / "songs.json").read_text(encoding="utf-8"))
+    theme = songs["categories"][0]["songs"][0]
+    assert theme["file"] == "ost/theme.ogg"
+    assert theme["video"] == "ost/theme.mp4"
+
+    calls.clear()
+    stats = pack_compiler.compile_pack(
+        tmp_path / "pack", tmp_path / "out", executor=ThreadPoolExecutor()
+    )
+    assert stats == {"compiled": 0, "skipped": 2, "failed": 1}
+    assert calls == []
+
+    (tmp_path / "pack" / "ost" / "theme.mp3").write_bytes(b"new audio")
+    stats = pack_compiler.compile_pack(
+        tmp_path / "pack", tmp_path / "out", executor=ThreadPoolExecutor()
+    )
+    assert calls == [("theme.mp3", "file")]
+
+def test_missing_loudnorm_output_is_a_value_error(monkeypatch):
+    monkeypatch.setattr(
+        pack_compiler.subprocess, "run",
+        lambda args, **kwargs: subprocess.CompletedProcess(args, 0, "", "no audio"),
+    )
+    with pytest.raises(ValueError):
+        pack_compiler.measure_loudness("silent.mp4")
+
+def test_video_without_audio_is_not_normalized(tmp_path, monkeypatch):
+    commands = []
+    monkeypatch.setattr(pack_compiler, "has_audio", lambda source: False)
+    monkeypatch.setattr(pack_compiler.subprocess, "run", lambda args, **kwargs: commands.append(args))
+    pack_compiler.transcode(tmp_path / "silent.mp4", tmp_path / "out.mp4", "video")
+    assert len(commands) == 1
+    assert "-af" not in commands[0]
@@ -0,0 +1,65 @@
+import json
+
+import pack_validator
+
+
+def write_pack(path, songs):
+    data = {"categories": [{"name": "C", "songs": songs}]}
+    (path / "songs.json").write_text(json.dumps(data), encoding="utf-8")
+
+def fake_probe(probed):
+    def probe(path):
+        probed.append(path.name)
+        if path.suffix == ".mp4":
+            return {"duration": 60.0, "audio": "aac", "video": "h264", "size": [640, 480]}
+        return {"duration": 30.0, "audio": "mp3", "video": None, "size": None}
+    return probe
+
+def test_schema_errors():
+    data = {"categories": [{"name": "C", "songs": [{"title": "A"}, {"title": "B", "file": "b.mp3", "start": -1}]}]}
+    errors = pack_validator.validate_schema(data)
+
+    assert errors == [
+        "category 1, song 1: missing file",
+        "category 1, song 2: start must be a positive number",
+    ]
+    assert pack_validator.validate_schema({}) == ["songs.json must contain a list of categories"]
+
+def test_validate_pack_reports_missing_files_and_bad_start(tmp_path):
+    (tmp_path / "a.mp3").write_bytes(b"a")
+    write_pack(tmp_path, [
+        {"title": "A", "file": "a.mp3", "video": "a.mp4", "start": 45},
+        {"title": "B", "file": "b.mp3", "video": "false"},
+    ])
+    report = pack_validator.validate_pack(tmp_path, probe=fake_probe([]))
+
+    assert report["errors"] == [
+        f"File not found {tmp_path / 'a.mp4'}",
+        f"File not found {tmp_path / 'b.mp3'}",
+    ]
+    assert report["warnings"] == ["A: start 45s is past the end of a.mp3 (30.0s)"]
+
+def test_validate_pack_only_probes_changed_files(tmp_path):
+    (tmp_path / "a.mp3").write_bytes(b"a")
+    (tmp_path / "a.mp4").write_bytes(b"v")
+    write_pack(tmp_path, [{"title": "A", "file": "a.mp3", "video": "a.mp4"}])
+    probed = []
+
+    report = pack_validator.validate_pack(tmp_path, probe=fake_probe(probed))
+    assert (report["probed"], report["cached"], report["errors"]) == (2, 0, [])
+    assert report["assets"]["a.mp4"]["size"] == [640, 480]
+
+    probed.clear()
+    (tmp_path / "a.mp3").write_bytes(b"changed")
+    report = pack_validator.validate_pack(tmp_path, probe=fake_probe(probed))
+    assert (report["probed"], report["cached"]) == (1, 1)
+    assert probed == ["a.mp3"]
+
+def test_audio_file_without_audio_stream_is_an_error(tmp_path):
+    (tmp_path / "a.mp3").write_bytes(b"a")
+    write_pack(tmp_path, [{"title": "A", "file": "a.mp3"}])
+    def probe(path):
+        return {"duration": 1.0, "audio": None, "video": None, "size": None}
+
+    report = pack_validator.validate_pack(tmp_path, probe=probe)
+    assert report["errors"] == ["No audio stream in a.mp3"]
@@ -0,0 +1,32 @@
+import json
+
+from profiler import NULL_SECTION, Profiler
+
+
+def test_disabled_profiler_measures_nothing():
+    profiler = Profiler()
+    with profiler.section("draw") as section:
+        pass
+    assert profiler.section("draw") is NULL_SECTION
+    assert section is None
+    assert profiler.summary() == {}
+
+def test_summary_percentiles_over_the_window():
+    profiler = Profiler(enabled=True, window=100)
+    for ms in range(200):
+        profiler.add("draw", 0.0, ms / 1000)
+    p50, p95, peak = profiler.summary()["draw"]
+    assert (round(p50), round(p95), round(peak)) == (150, 195, 199)
+    assert profiler.lines() == ["draw: 150.00 / 195.00 / 199.00 ms"]
+    assert not profiler.events
+
+def test_dump_writes_chrome_trace(tmp_path):
+    profiler = Profiler(trace=True)
+    with profiler.section("update"):
+        pass
+    profiler.dump(tmp_path / "profile.json")
+
+    trace = json.loads((tmp_path / "profile.json").read_text())
+    [event] = trace["traceEvents"]
+    assert (event["name"], event["ph"]) == ("update", "X")
+    assert event["dur"] >= 0
@@ -0,0 +1,111 @@
+import http.client
+import json
+import socket
+import time
+
+import pytest
+
+from remote import RemoteServer, is_loopback, parse_address
+
+
+@pytest.fixture
+def server():
+    server = RemoteServer(port=0, token="secret", broadcast_interval=0.05)
+    assert server.start()
+    yield server
+    server.stop()
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=2)
+    connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+    response = connection.getresponse()
+    data = json.loads(response.read())
+    connection.close()
+    return response.status, data
+
+def read_event(stream):
+    lines = []
+    while True:
+        line = stream.readline().decode().rstrip("\n")
+        if not line:
+            if lines:
+                break
+            continue
+        lines.append(line)
+    event = lines[0].split(": ", 1)[1]
+    return event, json.loads(lines[1].split(": ", 1)[1])
+
+def test_commands_are_queued_for_the_game_loop(server):
+    woken = []
+    server.on_command = lambda: woken.append(True)
+    auth = {"Authorization": "Bearer secret"}
+
+    assert request(server, "POST", "/command", {"command": "next_song"}, auth) == (202, {"queued": "next_song"})
+    assert request(server, "POST", "/command", {"command": "add_points", "player": 1, "points": 5}, auth)[0] == 202
+    assert server.poll() == [
+        {"command": "next_song"},
+        {"command": "add_points", "player": 1, "points": 5},
+    ]
+    assert server.poll() == []
+    assert woken == [True, True]
+
+def test_commands_need_the_token_and_a_known_name(server):
+    assert request(server, "POST", "/command", {"command": "next_song"})[0] == 401
+    auth = {"Authorization": "Bearer secret"}
+    assert request(server, "POST", "/command", {"command": "quit"}, auth)[0] == 400
+    assert request(server, "GET", "/missing")[0] == 404
+    assert server.poll() == []
+
+def test_commands_are_refused_outside_a_show(server):
+    server.accepting_commands = False
+    auth = {"Authorization": "Bearer secret"}
+    assert request(server, "POST", "/command", {"command": "next_song"}, auth) == (409, {"error": "no show is running"})
+    assert server.poll() == []
+
+def test_serves_the_page_and_answers_cors_preflight(server):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=2)
+    connection.request("GET", "/")
+    response = connection.getresponse()
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("text/html")
+    assert b"EventSource" in response.read()
+    connection.close()
+
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=2)
+    connection.request("OPTIONS", "/command", headers={"Origin": "http://phone", "Access-Control-Request-Headers": "authorization"})
+    response = connection.getresponse()
+    assert response.status == 204
+    assert response.getheader("Access-Control-Allow-Origin") == "*"
+    assert "Authorization" in response.getheader("Access-Control-Allow-Headers")
+    connection.close()
+
+def test_parse_address():
+    assert parse_address("8765") == ("127.0.0.1", 8765)
+    assert parse_address("0.0.0.0:80") == ("0.0.0.0", 80)
+    assert parse_address("[::1]:80") == ("::1", 80)
+    for value in ("", "abc", "host:", "host:99999"):
+        with pytest.raises(ValueError):
+            parse_address(value)
+    assert is_loopback("127.0.0.1") and is_loopback("::1") and is_loopback("localhost")
+    assert not is_loopback("0.0.0.0") and not is_loopback("192.168.1.10")
+
+def test_scoreboard_gets_state_then_coalesced_deltas(server):
+    server.publish({"players": [{"name": "A", "score": 0}], "paused": False})
+    deadline = time.time() + 2
+    while not server.broadcasts and time.time() < deadline:
+        time.sleep(0.01)
+
+    client = socket.create_connection((server.host, server.port), timeout=2)
+    client.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    stream = client.makefile("rb")
+    while stream.readline() not in (b"\r\n", b""):
+        pass
+    assert read_event(stream) == ("state", {"players": [{"name": "A", "score": 0}], "paused": False})
+
+    broadcasts = server.broadcasts
+    for score in range(1, 6):
+        server.publish({"players": [{"name": "A", "score": score}], "paused": False})
+    server.publish({"players": [{"name": "A", "score": 5}], "paused": True})
+    assert read_event(stream) == ("delta", {"players": [{"name": "A", "score": 5}], "paused": True})
+    assert server.broadcasts == broadcasts + 1
+    client.close()
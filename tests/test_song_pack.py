@@ -0,0 +1,65 @@
+import json
+
+from song_pack import SongPack
+
+PACK = {
+    "categories": [
+        {
+            "name": "80s",
+            "songs": [
+                {"title": "One", "file": "one.mp3", "video": "one.mp4"},
+                {"title": "Two", "file": "two.mp3", "video": "false", "start": 30, "duration": 15, "fade": 1.5},
+            ],
+        },
+        {"name": "90s", "songs": [{"title": "Three", "file": "three.mp3"}]},
+    ]
+}
+
+def test_load_builds_song_records(tmp_path):
+    (tmp_path / "songs.json").write_text(json.dumps(PACK), encoding="utf-8")
+    pack = SongPack.load(tmp_path)
+
+    assert len(pack) == 2
+    song = pack.song(0, 1)
+    assert (song.title, song.file, song.video) == ("Two", "two.mp3", None)
+    assert (song.start, song.duration, song.fade) == (30.0, 15.0, 1.5)
+    assert song.category.name == "80s"
+    assert pack.song(0, 0).video == "one.mp4"
+    assert pack.song(1, 0).duration is None
+    assert pack.path(song.file) == tmp_path / "two.mp3"
+
+def test_song_out_of_range_returns_none():
+    pack = SongPack.from_dict("data/pack", PACK)
+
+    assert pack.song(0, 2) is None
+    assert pack.song(2, 0) is None
+    assert pack.song(-1, 0) is None
+
+def test_categories_build_songs_lazily():
+    pack = SongPack.from_dict("data/pack", PACK)
+    category = pack.categories[1]
+
+    assert category._songs is None
+    assert len(category) == 1
+    assert category[0].title == "Three"
+    assert category._songs is not None
+
+def test_find_by_title():
+    pack = SongPack.from_dict("data/pack", PACK)
+
+    assert pack.find("Three") is pack.song(1, 0)
+    assert pack.find("Missing") is None
+
+def test_load_missing_file_gives_empty_pack(tmp_path, capsys):
+    pack = SongPack.load(tmp_path)
+
+    assert len(pack) == 0
+    assert pack.song(0, 0) is None
+    assert "Error: File not found" in capsys.readouterr().out
+
+def test_invalid_timing_is_reported_at_load(capsys):
+    data = {"categories": [{"name": "C", "songs": [{"title": "A", "file": "a.mp3", "start": "0:30", "fade": 2}]}]}
+    pack = SongPack.from_dict("data/pack", data)
+    assert "Invalid start '0:30' for song 'A'" in capsys.readouterr().out
+    song = pack.song(0, 0)
+    assert (song.start, song.fade) == (0.0, 2.0)
@@ -0,0 +1,35 @@
+from text_cache import TextCache
+
+
+class FakeFont:
+    def __init__(self):
+        self.rendered = []
+
+    def render(self, text, antialias, color):
+        self.rendered.append(text)
+        return (text, color)
+
+def test_render_is_cached_per_text_font_and_color():
+    font = FakeFont()
+    cache = TextCache()
+
+    assert cache.render(font, "Player 1") == ("Player 1", (255, 255, 255))
+    cache.render(font, "Player 1")
+    cache.render(font, "Player 1", (255, 0, 0))
+    cache.render(FakeFont(), "Player 1")
+
+    assert font.rendered == ["Player 1", "Player 1"]
+    assert cache.stats() == {"hits": 1, "misses": 3, "entries": 3}
+
+def test_least_recently_used_text_is_evicted():
+    font = FakeFont()
+    cache = TextCache(max_entries=2)
+    cache.render(font, "a")
+    cache.render(font, "b")
+    cache.render(font, "a")
+    cache.render(font, "c")
+
+    cache.render(font, "a")
+    cache.render(font, "b")
+    assert font.rendered == ["a", "b", "c", "b"]
+    assert len(cache) == 2
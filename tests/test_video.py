@@ -0,0 +1,58 @@
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("ffpyplayer")
+
+from ffpyplayer.player import MediaPlayer
+
+from video import FRAME_FORMAT, FrameUploader, choose_sws_flags, compute_target_size
+
+VIDEO = Path(__file__).parent.parent / "data" / "pack_01" / "ost" / "star_wars.mp4"
+
+
+def test_fit_keeps_aspect_ratio():
+    assert compute_target_size((1920, 1080), (800, 600), "fit") == (800, 450)
+    assert compute_target_size((640, 480), (1920, 1080), "fit") == (1440, 1080)
+
+def test_fill_stretches_to_screen():
+    assert compute_target_size((640, 480), (1920, 1080), "fill") == (1920, 1080)
+
+def test_native_never_upscales():
+    assert compute_target_size((640, 480), (1920, 1080), "native") == (640, 480)
+    assert compute_target_size((3840, 2160), (1920, 1080), "native") == (1920, 1080)
+
+def test_scaler_depends_on_ratio():
+    assert choose_sws_flags((1920, 1080), (1920, 1080)) == "point"
+    assert choose_sws_flags((3840, 2160), (800, 450)) == "area"
+    assert choose_sws_flags((640, 480), (1440, 1080)) == "fast_bilinear"
+    assert choose_sws_flags(None, None) == "fast_bilinear"
+
+def test_uploads_a_decoded_frame(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    player = MediaPlayer(str(VIDEO), ff_opts={"out_fmt": FRAME_FORMAT, "an": True})
+    try:
+        deadline = time.monotonic() + 10
+        frame = None
+        while frame is None and time.monotonic() < deadline:
+            frame, _ = player.get_frame()
+            time.sleep(0.01)
+        assert frame is not None
+        image, _ = frame
+        width, height = image.get_size()
+        pixels = bytes(image.to_memoryview(keep_align=True)[0])
+        linesize = image.get_linesizes(keep_align=True)[0]
+        surface = FrameUploader((width, height)).upload(image)
+        for x, y in ((0, 0), (width // 2, height // 2), (width - 1, height - 1)):
+            b, g, r = pixels[y * linesize + x * 4 : y * linesize + x * 4 + 3]
+            if FRAME_FORMAT != "bgr0":
+                r, g, b = pixels[y * linesize + x * 4 + 1 : y * linesize + x * 4 + 4]
+            assert tuple(surface.get_at((x, y))) == (r, g, b, 255)
+        uploader = FrameUploader((width // 2, height // 2))
+        assert uploader.upload(image).get_size() == (width // 2, height // 2)
+        assert len(uploader.upload_times) == 1
+    finally:
+        player.close_player()